@@ -1,7 +1,20 @@
+import time
+
 import streamlit as st
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+
+from analytics import derive_metrics, metric_series
+from cache import dataset_cache, normalize_company_url
+from compare import COMPARE_METRICS, cached_company_urls, compare_companies
+from fetch import fetcher
+from scoring import score_company
+from screen import screen, universe_cache
+from peers import PEER_METRICS, compare_peers
+from refresh import start_watchlist_refresher
+from scraper import ANALYSIS_WINDOWS, window_dataset
+from pipeline import start_company_load
+from store import financial_store
+from timing import prometheus_text, stage_timer, start_metrics_server
 
 
 if "logged_in" not in st.session_state:
@@ -10,6 +23,13 @@ if "logged_in" not in st.session_state:
 if "data_loaded" not in st.session_state:
     st.session_state.data_loaded = False
 
+# Keeps the WATCHLIST_FILE companies warm in the background, once per process.
+watchlist_refresher = start_watchlist_refresher()
+
+# Serves /metrics on METRICS_PORT, once per process.
+cache_counters = {"dataset_cache": dataset_cache, "page_revalidation": fetcher}
+start_metrics_server(cache_counters)
+
 
 st.set_page_config(page_title="Company Financial Diagnostics",layout="wide")
 st.title("Company Financial Diagnostics System")
@@ -35,207 +55,6 @@ if st.button("Analyze Company") and url:
     st.session_state.data_loaded = True
 
 
-def clean_numeric_value(text):
-    if text is None:
-        return None
-
-    text = text.replace("₹", "").replace(",", "").strip()
-
-    if "Cr" in text:
-        number = text.replace("Cr.", "").replace("Cr", "").strip()
-        try:
-            return float(number) * 10000000
-        except:
-            return None
-
-    if text in ["", "-", "—"]:
-        return None
-
-    if "%" in text:
-        return float(text.replace("%", ""))
-
-    try:
-        return float(text)
-    except:
-        return None
-
-
-def clean_table_value(text):
-    return clean_numeric_value(text.strip())
-
-
-#------------------------------
-# Company Name
-# -----------------------------
-def scrape_company_name(url):
-    soup = BeautifulSoup(requests.get(url).text,"html.parser")
-    division = soup.find("div", class_= "flex flex-space-between container hide-from-tablet-landscape" )
-    name= division.find("h1",class_="h2 shrink-text").text.split()
-    company_name = (" ".join(name))
-    return company_name
-    
-
-def scrape_sector(url):
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
-
-    section = soup.find("section", id="peers")
-    p = section.find("p", class_="sub")
-    Broad_sector = p.find("a", title="Broad Sector")
-    Sector =  p.find("a", title="Sector")
-    Broad_Industry = p.find("a", title="Broad Industry")
-    Industry = p.find("a", title="Industry")
-
-
-
-    data = {
-        "Broad Sector": Broad_sector ,
-        "Sector": Sector ,
-        "Broad Industry": Broad_Industry ,
-        "Industry": Industry
-    }
-
-    return pd.DataFrame([data])  
-
-# -----------------------------
-# Top Ratios
-# -----------------------------
-def scrape_company_ratios(url, company):
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
-
-    ratios = soup.find("ul", id="top-ratios")
-    data = []
-
-    for li in ratios.find_all("li"):
-        name = li.find("span", class_="name").text.strip()
-        value_text = li.find("span", class_="value").text.strip()
-
-        if "High / Low" in name:
-            high, low = value_text.replace("₹", "").replace(",", "").split("/")
-            data.append([company, "52W High", float(high)])
-            data.append([company, "52W Low", float(low)])
-        else:
-            data.append([company, name, clean_numeric_value(value_text)])
-
-    return pd.DataFrame(data, columns=["Company", "Metric", "Value"])
-
-
-
-# -----------------------------
-# Generic Financial Table Scraper
-# -----------------------------
-def scrape_financial_section(url, section_id, company):
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
-
-    section = soup.find("section", id=section_id)
-    table = section.find("table")
-
-    years = [th.text.replace("Mar ", "").replace("Sep ", "").strip()for th in table.find("thead").find_all("th")[1:]]
-
-    records = []
-
-    for row in table.find("tbody").find_all("tr"):
-        cols = row.find_all("td")
-        if len(cols) <= 1:
-            continue
-
-        metric = cols[0].text.strip()
-        values = [clean_table_value(td.text) for td in cols[1:]]
-
-        for year, value in zip(years, values):
-            records.append({
-                "Company": company,
-                "Year": year,
-                "Metric": metric,
-                "Value": value
-            })
-
-    return pd.DataFrame(records)
-
-# ---------------------------
-# Yearly Shareholding Scraper
-# ---------------------------
-
-def scrape_yearly_shareholding(url, company):
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
-    
-    yearly_div = soup.find("section",id ="shareholding").find("div", id="yearly-shp")
-    table = yearly_div.find("table", class_="data-table")
-    years = []
-    for th in table.find("thead").find_all("th")[1:]:
-        text = th.text.strip()
-        year = text.split()[-1]  # "Mar 2017" → "2017"
-        years.append(year)
-
-    records = []
-
-    for rows in table.find("tbody").find_all("tr"):
-        cols = rows.find_all("td")
-        if len(cols) <= 1:
-            continue
-
-        metric = cols[0].text.strip()
-        values = [clean_table_value(td.text) for td in cols[1:]]
-
-        for year, value in zip(years, values):
-            records.append({
-                "Company": company,
-                "Year": year,
-                "Metric": metric,
-                "Value": value
-            })
-
-    return pd.DataFrame(records)
-
-# -----------------------------
-# Quarterly Profit & Loss Scraper
-# -----------------------------
-def scrape_pnl_quarterly(url, company):
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
-
-    section = soup.find("section", id="quarters")
-    if section is None:
-        return pd.DataFrame()
-
-    table = section.find("table")
-    thead = table.find("thead")
-    tbody = table.find("tbody")
-
-    quarters = []
-    records = []
-
-    # Extract quarters
-    for th in thead.find_all("th")[1:]:
-        quarters.append(th.text.strip())
-
-    # Extract data
-    for tr in tbody.find_all("tr"):
-        cols = tr.find_all("td")
-        if len(cols) <= 1:
-            continue
-
-        metric = cols[0].text.strip()
-        values = [clean_table_value(td.text) for td in cols[1:]]
-
-        for quarter, value in zip(quarters, values):
-            records.append({
-                "Company": company,
-                "Quarter": quarter,
-                "Metric": metric,
-                "Value": value
-            })
-
-    df = pd.DataFrame(records)
-    return (df.pivot_table( index=["Company", "Quarter"], columns="Metric",values="Value").reset_index())
- 
-
-# -----------------------------
-# Pivot from long to wide format
-# -----------------------------
-def process_statement(df):
-    return (
-        df.pivot_table( index=["Company", "Year"], columns="Metric",values="Value").reset_index())
-
-
 def get_ratio_value(ratios_df, metric_name):
     try:
         value = ratios_df.loc[ratios_df["Metric"] == metric_name, "Value"].values
@@ -262,903 +81,866 @@ def compute_growth(series):
         return None
     return series.pct_change() * 100
 
-def clean_year_column(df):
-    df = df.copy()
-
-    # Convert to string and clean whitespace
-    df["Year"] = df["Year"].astype(str).str.strip()
-
-    # Extract 4-digit year only (e.g. 2016 from "2016\n18m")
-    df["Year"] = df["Year"].str.extract(r"(\d{4})", expand=False)
-
-    # Drop rows where year could not be extracted
-    df = df.dropna(subset=["Year"])
-
-    # Convert to int
-    df["Year"] = df["Year"].astype(int)
-
-    return df
-
+def memoized(analysis_window, name, compute):
+    # Tab analytics are kept per session for the loaded dataset, one entry per
+    # analysis window, so switching tabs or windows back and forth reuses them.
+    memo = st.session_state.get("analytics")
+    if memo is None or memo["dataset"] is not st.session_state.dataset:
+        memo = st.session_state.analytics = {"dataset": st.session_state.dataset, "windows": {}}
+
+    results = memo["windows"].setdefault(analysis_window, {})
+    if name not in results:
+        results[name] = compute()
+    return results[name]
+
+def render_overview(ratios_df):
+    st.subheader("Company Overview")
+
+    # --- Extract key ratios ---
+    market_cap = get_ratio_value(ratios_df, "Market Cap")
+    current_price = get_ratio_value(ratios_df, "Current Price")
+    pe_ratio = get_ratio_value(ratios_df, "Stock P/E")
+    roe = get_ratio_value(ratios_df, "ROE")
+    roce = get_ratio_value(ratios_df, "ROCE")
+    dividend_yield = get_ratio_value(ratios_df, "Dividend Yield")
+    high_52w = get_ratio_value(ratios_df,"52W High")
+    low_52w = get_ratio_value(ratios_df,"52W Low")
+    face_value = get_ratio_value(ratios_df,"Face Value")
+    book_value = get_ratio_value(ratios_df,"Book Value")
+    roe_roce_gap = roe - roce if roe and roce else "NA"
+    valuation_density = pe_ratio / roe if pe_ratio and roe else "NA"
+    # --- Headline Metrics ---
+    col1, col2, col3, col4 = st.columns(4)
+
+    col1.metric("Market Cap", formatting(market_cap,"currency") if market_cap else "NA")
+    col2.metric("Current Price",formatting(current_price,"price")if current_price else "NA")
+    col3.metric("P/E Ratio", formatting(pe_ratio,"ratio")if pe_ratio else "NA")
+    col4.metric("Book Value", formatting(book_value,"price") if book_value else "NA")
+    
+    col5, col6, col7, col8 = st.columns(4)
+    
+    col5.metric("ROCE (%)", formatting(roce,"percent") if roce else "NA")
+    col6.metric("Dividend Yield (%)", formatting(dividend_yield,"percent") if dividend_yield else "NA")
+    col7.metric("ROE (%)", formatting(roe,"percent") if roe else "NA")
+    col8.metric("ROE_ROCE_Gap",formatting(roe_roce_gap,"ratio") if roe_roce_gap else "NA")
+
+    col9, col10, col11, col12 = st.columns(4)
+    col9.metric("52W High", formatting(high_52w,"price") if high_52w else "NA")
+    col10.metric("52W Low", formatting(low_52w,"price") if low_52w else "NA")
+    col11.metric("Face Value",formatting( face_value,"price") if face_value else "NA")
+    col12.metric("Valuation Density",formatting(valuation_density,'ratio') if valuation_density else "NA")
+
+        # --- Automated Summary ---
+    summary_points = []
+
+    if roe and roe < 10:
+        summary_points.append("The company demonstrates low return on equity.")
+    elif roe <15:
+        summary_points.append("Return on equity remains moderate.")
+    else:
+        summary_points.append("The company demonstrates strong return on equity")
+
+
+    if roce > 18:
+        summary_points.append("Capital is being employed efficiently.")
+    elif roce > 12:
+        summary_points.append("Capital efficiency appears average.")
+    else:
+         summary_points.append("Capital efficiency appears meagre.")
+
+    if dividend_yield and dividend_yield > 1:
+        summary_points.append("The company provides regular income to shareholders.")
+
+    if pe_ratio and pe_ratio > 30:
+        summary_points.append("Valuation appears relatively high based on earnings.")
+
+    if summary_points:
+        st.markdown("### Key Observations")
+        for point in summary_points:
+            st.text(f"• {point}")
+    else:
+        st.info("Insufficient ratio data to generate summary insights.")
+
+
+def render_loading(company_load):
+    # Shown while the company loads in the background: the Overview as soon
+    # as the top ratios are in, the other tabs once the statements are.
+    if company_load.overview is None:
+        st.info("Fetching company financial data...")
+        return
+
+    st.info(f"Loading the financial statements of {company_load.overview['company_name']}; the other tabs open when they are ready.")
+    render_overview(company_load.overview["ratios_df"])
 
 if st.session_state.data_loaded and url:
 
-    if "pnl_y_df" not in st.session_state:
-
-        with st.spinner("Fetching company financial data..."):
-                company_name = scrape_company_name(url)
+    if "dataset" not in st.session_state:
+        # The page is loaded in a background thread; this script polls it
+        # and renders what is ready. The shared cache keeps each company in
+        # compact arrays and hands every session its own frames. Yearly
+        # frames are cleaned and Year-indexed once per company.
+        company_load = st.session_state.get("company_load")
+        if company_load is None or company_load.url != url:
+            company_load = st.session_state.company_load = start_company_load(url)
+
+        if not company_load.finished.is_set():
+            render_loading(company_load)
+            time.sleep(0.2)
+            st.rerun()
 
-                ratios_df = scrape_company_ratios(url, company_name)
+        del st.session_state.company_load
+        st.session_state.dataset = company_load.result()
 
-                pnl_q_df = scrape_pnl_quarterly(url, company_name)
+    dataset = st.session_state.dataset
+    company_name = dataset["company_name"]
+    ratios_df = dataset["ratios_df"]
+    pnl_q_df = dataset["pnl_q_df"]
+    pnl_y_df = dataset["pnl_y_df"]
+    balance_df = dataset["balance_df"]
+    cashflow_df = dataset["cashflow_df"]
+    shareholding_df = dataset["shareholding_df"]
 
-                pnl_y_raw = scrape_financial_section(url, "profit-loss", company_name)
-                pnl_y_df = process_statement(pnl_y_raw)
-                pnl_y_df.columns = (pnl_y_df.columns.str.replace(r"\s*\+\s*$", "", regex=True).str.strip())
-                pnl_q_df.columns = ( pnl_q_df.columns.str.replace(r"\s*\+\s*$", "", regex=True).str.strip())
+    with st.sidebar:
+        st.header("Analysis Controls")
 
+        analysis_window = st.selectbox("Analysis Window", list(ANALYSIS_WINDOWS))
 
+        # st.tabs runs every tab body on each rerun; the lazy mode swaps it for a
+        # selector and runs only the tab being viewed.
+        lazy_tabs = st.toggle("Render only the selected tab", value=True)
 
-                balance_raw = scrape_financial_section(url, "balance-sheet", company_name)
-                balance_df = process_statement(balance_raw)
-                balance_df.columns = (balance_df.columns.str.replace(r"\s*\+\s*$","", regex=True).str.strip())
+        if st.button("Reset Analysis"):
+            st.session_state.data_loaded = False
+            st.session_state.pop("dataset", None)
+            st.rerun()
 
-                cashflow_raw = scrape_financial_section(url, "cash-flow", company_name)
-                cashflow_df = process_statement(cashflow_raw)
-                cashflow_df.columns= (cashflow_df.columns.str.replace(r"\s*\+\s*$","", regex=True).str.strip())
+        if st.button("Refresh Company Data"):
+            dataset_cache.invalidate(url)
+            financial_store.expire(url)
+            st.session_state.pop("dataset", None)
+            st.rerun()
 
-                shareholding_raw = scrape_yearly_shareholding(url, company_name)
-                shareholding_df = process_statement(shareholding_raw)
-                shareholding_df.columns = (shareholding_df.columns.str.replace(r"\s*\+\s*$","", regex=True).str.strip())
+        cache_stats = dataset_cache.stats()
+        st.caption(f"Dataset cache: {cache_stats['entries']} companies ({cache_stats['bytes'] / 1024:.0f} KB), {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
+        if watchlist_refresher is not None:
+            st.caption(f"Watchlist: {len(watchlist_refresher.latest)} of {len(watchlist_refresher.urls)} companies refreshed")
 
+        if st.button("Logout"):
+            st.session_state.clear()
+            st.rerun()
 
+        # Windowed frames are slices of the Year-sorted frames, TTM excluded.
+        windowed = memoized(analysis_window, "windowed", lambda: window_dataset(dataset, analysis_window))
+        pnl_y_df = windowed["pnl_y_df"]
+        balance_df = windowed["balance_df"]
+        cashflow_df = windowed["cashflow_df"]
+        shareholding_df = windowed["shareholding_df"]
 
 
-        with st.sidebar:
-            st.header("Analysis Controls")
+    def derived_metrics():
+        # Growth, CAGR, margin, conversion and volatility stats of this company.
+        return memoized(analysis_window, "derived", lambda: derive_metrics(windowed))
 
-            analysis_window = st.selectbox("Analysis Window",["Last Decade","Last 3 Years", "Last 5 Years","Last 7 Years"])
 
-            if st.button("Reset Analysis"):
-                st.session_state.data_loaded = False
-                st.rerun()
+    def render_dataset():
 
-            if st.button("Logout"):
-                st.session_state.clear()
-                st.rerun()
+        st.subheader("Company Fundamental Ratios")
+        st.dataframe(ratios_df)
+        st.subheader("Profit & Loss Quarterly")
+        st.dataframe(pnl_q_df)
+        st.subheader("Profit & Loss Yearly")
+        st.dataframe(pnl_y_df)
+        st.subheader("Yearly Balance Sheet")
+        st.dataframe(balance_df)
+        st.subheader("Yearly Cashflow")
+        st.dataframe(cashflow_df)
+        st.subheader("Yearly Shareholding")
+        st.dataframe(shareholding_df)
 
-            pnl_y_df = clean_year_column(pnl_y_df)
-            balance_df = clean_year_column(balance_df)
-            cashflow_df = clean_year_column(cashflow_df)
-            shareholding_df = clean_year_column(shareholding_df)
 
 
-            max_year = pnl_y_df["Year"].max()
+    def render_performance():
+        st.subheader("Performance & Growth")
 
-            if analysis_window == "Last Decade":
-                start_year = max_year - 9
-            elif analysis_window == "Last 3 Years":
-                start_year = max_year - 2
-            elif analysis_window == "Last 5 Years":
-                start_year = max_year - 4
-            elif analysis_window == "Last 7 Years":
-                start_year = max_year - 6
-            
+        # ---------- YEARLY TRENDS ----------
+        st.markdown("### Yearly Trends")
 
+        yearly_cols = ["Year", "Sales", "Net Profit", "EPS in Rs"]
+        yearly_available = [c for c in yearly_cols if c in pnl_y_df.columns]
 
-            pnl_y_df = pnl_y_df[pnl_y_df["Year"] >= start_year]
-            balance_df = balance_df[balance_df["Year"] >= start_year]
-            cashflow_df = cashflow_df[cashflow_df["Year"] >= start_year]
-            shareholding_df = shareholding_df[shareholding_df["Year"] >= start_year]
-
-
-        tabs = st.tabs(["Dataset",
-                        "Overview",
-                        "Performance & Growth",
-                        "Profitability & Efficiency",
-                        "Financial Position",
-                        "Cash Flow Quality",
-                        "Shareholding",
-                        "Executive Page",
-                         "Exit Page" ])
-
-        with tabs[0]:
-
-            st.subheader("Company Fundamental Ratios")
-            st.dataframe(ratios_df)
-            st.subheader("Profit & Loss Quarterly")
-            st.dataframe(pnl_q_df)
-            st.subheader("Profit & Loss Yearly")
-            st.dataframe(pnl_y_df)
-            st.subheader("Yearly Balance Sheet")
-            st.dataframe(balance_df)
-            st.subheader("Yearly Cashflow")
-            st.dataframe(cashflow_df)
-            st.subheader("Yearly Shareholding")
-            st.dataframe(shareholding_df)
-
-
-
-        with tabs[1]:
-            st.subheader("Company Overview")
-
-            # --- Extract key ratios ---
-            market_cap = get_ratio_value(ratios_df, "Market Cap")
-            current_price = get_ratio_value(ratios_df, "Current Price")
-            pe_ratio = get_ratio_value(ratios_df, "Stock P/E")
-            roe = get_ratio_value(ratios_df, "ROE")
-            roce = get_ratio_value(ratios_df, "ROCE")
-            dividend_yield = get_ratio_value(ratios_df, "Dividend Yield")
-            high_52w = get_ratio_value(ratios_df,"52W High")
-            low_52w = get_ratio_value(ratios_df,"52W Low")
-            face_value = get_ratio_value(ratios_df,"Face Value")
-            book_value = get_ratio_value(ratios_df,"Book Value")
-            roe_roce_gap = roe - roce if roe and roce else "NA"
-            valuation_density = pe_ratio / roe if pe_ratio and roe else "NA"
-            # --- Headline Metrics ---
-            col1, col2, col3, col4 = st.columns(4)
-
-            col1.metric("Market Cap", formatting(market_cap,"currency") if market_cap else "NA")
-            col2.metric("Current Price",formatting(current_price,"price")if current_price else "NA")
-            col3.metric("P/E Ratio", formatting(pe_ratio,"ratio")if pe_ratio else "NA")
-            col4.metric("Book Value", formatting(book_value,"price") if book_value else "NA")
+        if len(yearly_available) >= 2:
+            yearly_df = pnl_y_df
+            metrics = derived_metrics().iloc[0]
             
-            col5, col6, col7, col8 = st.columns(4)
-            
-            col5.metric("ROCE (%)", formatting(roce,"percent") if roce else "NA")
-            col6.metric("Dividend Yield (%)", formatting(dividend_yield,"percent") if dividend_yield else "NA")
-            col7.metric("ROE (%)", formatting(roe,"percent") if roe else "NA")
-            col8.metric("ROE_ROCE_Gap",formatting(roe_roce_gap,"ratio") if roe_roce_gap else "NA")
-
-            col9, col10, col11, col12 = st.columns(4)
-            col9.metric("52W High", formatting(high_52w,"price") if high_52w else "NA")
-            col10.metric("52W Low", formatting(low_52w,"price") if low_52w else "NA")
-            col11.metric("Face Value",formatting( face_value,"price") if face_value else "NA")
-            col12.metric("Valuation Density",formatting(valuation_density,'ratio') if valuation_density else "NA")
-
-                # --- Automated Summary ---
-            summary_points = []
-
-            if roe and roe < 10:
-                summary_points.append("The company demonstrates low return on equity.")
-            elif roe <15:
-                summary_points.append("Return on equity remains moderate.")
-            else:
-                summary_points.append("The company demonstrates strong return on equity")
-    
-
-            if roce > 18:
-                summary_points.append("Capital is being employed efficiently.")
-            elif roce > 12:
-                summary_points.append("Capital efficiency appears average.")
-            else:
-                 summary_points.append("Capital efficiency appears meagre.")
-
-            if dividend_yield and dividend_yield > 1:
-                summary_points.append("The company provides regular income to shareholders.")
-
-            if pe_ratio and pe_ratio > 30:
-                summary_points.append("Valuation appears relatively high based on earnings.")
-
-            if summary_points:
-                st.markdown("### Key Observations")
-                for point in summary_points:
-                    st.text(f"• {point}")
-            else:
-                st.info("Insufficient ratio data to generate summary insights.")
+            colA, colB = st.columns(2)
 
-        
+            with colA:
+                if "Sales" in yearly_df.columns:
+                    st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Sales"])
 
+                   
+                if metrics["Sales", "growth_mean"] > 0.10:
+                    direction = "strong growth"
+                elif metrics["Sales", "growth_mean"] > 0:
+                    direction = "moderate growth"
+                else:
+                    direction = "weak or negative growth"
 
-        with tabs[2]:
-            st.subheader("Performance & Growth")
+                volatility = metrics["Sales", "growth_std"]
 
-            # ---------- YEARLY TRENDS ----------
-            st.markdown("### Yearly Trends")
+                if volatility < 0.05:
+                    stability = "stable"
+                else:
+                    stability = "volatile"
+
+                st.info(f"Revenue shows {direction} with relatively {stability} year-on-year performance.") 
+
+            with colB:
+                if "Net Profit" in yearly_df.columns:
+                    st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Net Profit"])
+                if metrics["Net Profit", "count"] >= 3:
+                        if "Sales" in yearly_df.columns:
+                                if metrics["Net Profit", "growth_mean"] > metrics["Sales", "growth_mean"]:
+                                    st.success("Net profit growth outpaces revenue growth, indicating operating leverage and improving cost efficiency.")
+                                elif metrics["Net Profit", "growth_mean"] < metrics["Sales", "growth_mean"]:
+                                    st.warning("Net profit growth lags revenue growth, suggesting margin pressure or rising costs.")
+                                else:
+                                    st.info("Net profit and revenue growth move broadly in line.")
+                else:
+                    st.info("Insufficient data to assess net profit trend.")
 
-            yearly_cols = ["Year", "Sales", "Net Profit", "EPS in Rs"]
-            yearly_available = [c for c in yearly_cols if c in pnl_y_df.columns]
 
-            if len(yearly_available) >= 2:
-                yearly_df = pnl_y_df[pnl_y_df.Year != "TTM"]
-                yearly_df=yearly_df.sort_values("Year")
+            if "EPS in Rs" in yearly_df.columns:
+                st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["EPS in Rs"])
+                if metrics["EPS", "count"] >= 3:
+                    if metrics["EPS", "growth_mean"] > 0:
+                        st.success("Earnings per share show an upward trend, indicating that business growth is translating into shareholder returns.")
+                    else:
+                        st.warning("EPS growth remains muted despite business performance.")
+                else:
+                    st.info("Insufficient data to assess EPS trend.")
                 
-                colA, colB = st.columns(2)
-
-                with colA:
-                    if "Sales" in yearly_df.columns:
-                        st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Sales"])
 
-                       
-                    series = yearly_df["Sales"].dropna()
-                    growth = series.pct_change().dropna()
 
-                    if growth.mean() > 0.10:
-                        direction = "strong growth"
-                    elif growth.mean() > 0:
-                        direction = "moderate growth"
-                    else:
-                        direction = "weak or negative growth"
+        # ---------- QUARTERLY TRENDS ----------
+        st.markdown("### Quarterly Trends")
 
-                    volatility = growth.std()
+        q_cols = ["Quarter", "Sales", "Net Profit"]
+        q_available = [c for c in q_cols if c in pnl_q_df.columns]
 
-                    if volatility < 0.05:
-                        stability = "stable"
-                    else:
-                        stability = "volatile"
-
-                    st.info(f"Revenue shows {direction} with relatively {stability} year-on-year performance.") 
-
-                with colB:
-                    if "Net Profit" in yearly_df.columns:
-                        st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Net Profit"])
-                        profit_series = yearly_df["Net Profit"].dropna()
-                        profit_growth = profit_series.pct_change().dropna()
-                    if len(profit_series) >= 3:
-                            if "Sales" in yearly_df.columns:
-                                    sales_growth = yearly_df["Sales"].pct_change().dropna()
-
-                                    if profit_growth.mean() > sales_growth.mean():
-                                        st.success("Net profit growth outpaces revenue growth, indicating operating leverage and improving cost efficiency.")
-                                    elif profit_growth.mean() < sales_growth.mean():
-                                        st.warning("Net profit growth lags revenue growth, suggesting margin pressure or rising costs.")
-                                    else:
-                                        st.info("Net profit and revenue growth move broadly in line.")
-                    else:
-                        st.info("Insufficient data to assess net profit trend.")
+        if len(q_available) >= 2:
+            q_df = memoized(analysis_window, "quarterly", lambda: pnl_q_df[q_available]
+                            .assign(Quarter_dt=lambda q: pd.to_datetime(q.Quarter, format="%b %Y"))
+                            .sort_values("Quarter_dt"))
+            q_df.set_index("Quarter_dt")
 
+            colC, colD = st.columns(2)
 
-                if "EPS in Rs" in yearly_df.columns:
-                    st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["EPS in Rs"])
-                    eps_series = yearly_df["EPS in Rs"].dropna()
+            with colC:
+                if "Sales" in q_df.columns:
+                    st.line_chart(q_df.set_index("Quarter_dt")["Sales"])
+                    q_sales = q_df["Sales"].dropna()
 
-                    if len(eps_series) >= 3:
-                        eps_growth = eps_series.pct_change().dropna()
-                        avg_eps_growth = eps_growth.mean()
+                    if len(q_sales) >= 4:
+                        q_growth = q_sales.pct_change().dropna()
 
-                        if avg_eps_growth > 0:
-                            st.success("Earnings per share show an upward trend, indicating that business growth is translating into shareholder returns.")
+                        if q_growth.std() < 0.10:
+                            st.success("Quarterly revenue shows relatively stable momentum with limited short-term volatility.")
                         else:
-                            st.warning("EPS growth remains muted despite business performance.")
+                            st.warning("Quarterly revenue exhibits noticeable volatility, indicating short-term demand fluctuations.")
                     else:
-                        st.info("Insufficient data to assess EPS trend.")
-                    
-
-
-            # ---------- QUARTERLY TRENDS ----------
-            st.markdown("### Quarterly Trends")
-
-            q_cols = ["Quarter", "Sales", "Net Profit"]
-            q_available = [c for c in q_cols if c in pnl_q_df.columns]
-
-            if len(q_available) >= 2:
-                q_df = pnl_q_df[q_available].copy()
-                q_df["Quarter_dt"]=pd.to_datetime(q_df.Quarter,format = "%b %Y")
-                q_df = q_df.sort_values("Quarter_dt")
-                q_df.set_index("Quarter_dt")
-
-                colC, colD = st.columns(2)
+                        st.info("Limited quarterly data to assess revenue momentum.")
+                   
 
-                with colC:
-                    if "Sales" in q_df.columns:
-                        st.line_chart(q_df.set_index("Quarter_dt")["Sales"])
-                        q_sales = q_df["Sales"].dropna()
+            with colD:
+                if "Net Profit" in q_df.columns:
+                    st.line_chart(q_df.set_index("Quarter_dt")["Net Profit"])
+                    q_profit = q_df["Net Profit"].dropna()
 
-                        if len(q_sales) >= 4:
-                            q_growth = q_sales.pct_change().dropna()
+                    if len(q_profit) >= 4:
+                        q_profit_growth = q_profit.pct_change().dropna()
 
-                            if q_growth.std() < 0.10:
-                                st.success("Quarterly revenue shows relatively stable momentum with limited short-term volatility.")
-                            else:
-                                st.warning("Quarterly revenue exhibits noticeable volatility, indicating short-term demand fluctuations.")
+                        if q_profit_growth.mean() > 0:
+                            st.success("Quarterly profits show improving momentum in recent periods.")
                         else:
-                            st.info("Limited quarterly data to assess revenue momentum.")
-                       
-
-                with colD:
-                    if "Net Profit" in q_df.columns:
-                        st.line_chart(q_df.set_index("Quarter_dt")["Net Profit"])
-                        q_profit = q_df["Net Profit"].dropna()
-
-                        if len(q_profit) >= 4:
-                            q_profit_growth = q_profit.pct_change().dropna()
-
-                            if q_profit_growth.mean() > 0:
-                                st.success("Quarterly profits show improving momentum in recent periods.")
-                            else:
-                                st.warning("Quarterly profits appear uneven,suggesting sensitivity to costs or one-off factors.")
-                        else:
-                            st.info("Limited quarterly data to assess profit stability.")
-                
-        with tabs[3]:
-            st.subheader("Profitability & Efficiency")
-            yearly_df = pnl_y_df[pnl_y_df.Year != "TTM"].sort_values("Year")
-            st.markdown("### Operating Profitability")
+                            st.warning("Quarterly profits appear uneven,suggesting sensitivity to costs or one-off factors.")
+                    else:
+                        st.info("Limited quarterly data to assess profit stability.")
             
+    def render_profitability():
+        st.subheader("Profitability & Efficiency")
+        yearly_df = pnl_y_df
+        metrics = derived_metrics().iloc[0]
+        st.markdown("### Operating Profitability")
+        
 
-            
-            if 'Operating Profit' in yearly_df.columns:
-                st.area_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Operating Profit"])
-                op_series = yearly_df["Operating Profit"].dropna()
-                if len(op_series)>=3:
-                    op_growth = op_series.pct_change().dropna()
-                    if op_growth.mean() > 0:
-                        st.success("Operating profits show an upward trend, indicating improving core business performance.")
-                    else:
-                        st.warning("Operating profit growth appears weak, suggesting pressure on core operations.")
+        
+        if 'Operating Profit' in yearly_df.columns:
+            st.area_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["Operating Profit"])
+            if metrics["Operating Profit", "count"] >= 3:
+                if metrics["Operating Profit", "growth_mean"] > 0:
+                    st.success("Operating profits show an upward trend, indicating improving core business performance.")
+                else:
+                    st.warning("Operating profit growth appears weak, suggesting pressure on core operations.")
+        else:
+            st.info("Insufficient data to assess operating profit trend.")
+        
+        if "OPM %" in yearly_df.columns:
+            st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["OPM %"])
+            if metrics["OPM", "count"] >= 3:
+                if metrics["OPM", "step"] > 0:
+                    st.success("Opearing margins are expanding over time, indicating improvement in cost efficiency or better pricing")
+                elif metrics["OPM", "step"] < 0:
+                    st.warning("Operating margins are contracting, suggesting rising costs or pricing pressure.")
+                else:
+                    st.info("Operating margins remain broadly stable over time.")
             else:
-                st.info("Insufficient data to assess operating profit trend.")
-            
-            if "OPM%" in yearly_df.columns:
-                st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))["OPM%"])
-                margin_series = yearly_df["OPM%"].dropna()
-                if len(margin_series) >= 3:
-                    margin_change = margin_series.diff().dropna()
-                    if margin_change.mean()>0:
-                        st.success("Opearing margins are expanding over time, indicating improvement in cost efficiency or better pricing")
-                    elif margin_change.mean()<0:
-                        st.warning("Operating margins are contracting, suggesting rising costs or pricing pressure.")
-                    else:
-                        st.info("Operating margins remain broadly stable over time.")
+                st.info("Insufficient data to assess margin trend.")
+
+        st.markdown("### Profit Conversion Efficiency")
+        if "Net Profit" in yearly_df.columns and "Operating Profit" in yearly_df.columns:
+            st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))[["Operating Profit", "Net Profit"]])
+            if metrics["Net Profit", "count"] >= 3 and metrics["Operating Profit", "count"] >= 3:
+                if metrics["Profit Conversion", "mean"] > 0.75:
+                    st.success("A high proportion of operating profit converts into net profit, indicating efficient cost, interest, and tax management.")
                 else:
-                    st.info("Insufficient data to assess margin trend.")
-
-            st.markdown("### Profit Conversion Efficiency")
-            if "Net Profit" in yearly_df.columns and "Operating Profit" in yearly_df.columns:
-                st.line_chart(yearly_df.set_index(yearly_df["Year"].astype(str))[["Operating Profit", "Net Profit"]])
-                net_profit = yearly_df["Net Profit"].dropna()
-                operating_profit = yearly_df["Operating Profit"].dropna()
-                if len(net_profit) >= 3 and len(operating_profit) >= 3:
-                    ratio = (net_profit / operating_profit).mean()
-                    if ratio > 0.75:
-                        st.success("A high proportion of operating profit converts into net profit, indicating efficient cost, interest, and tax management.")
-                    else:
-                        st.warning("Net profit conversion from operating profit is relatively low, suggesting leakage through interest, depreciation, or taxes.")
-
-
-            st.markdown("### Return on Capital Employed")
-            roe = ratios_df.loc[ratios_df["Metric"] == "ROE", "Value"]
-            roce = ratios_df.loc[ratios_df["Metric"] == "ROCE", "Value"]
-            col3, col4 = st.columns(2)
-
-            with col3:
-                if not roe.empty:
-                     roe_value = roe.values[0]
-                     st.metric("ROE (%)", roe_value)
-                     if roe_value > 15:
-                        st.success("Return on equity is strong, reflecting efficient use of shareholder capital.")
-                     else:
-                        st.warning("Return on equity is moderate, indicating scope for improved capital efficiency.")
-            
-            with col4:
-                        if not roce.empty:
-                            roce_value = roce.values[0]
-                            st.metric("ROCE (%)", roce_value)
-
-                            if roce_value > 15:
-                                st.success("ROCE is healthy, indicating effective deployment of long-term capital.")
-                            else:
-                                st.warning("ROCE is relatively low, suggesting suboptimal capital utilization.")
+                    st.warning("Net profit conversion from operating profit is relatively low, suggesting leakage through interest, depreciation, or taxes.")
+
+
+        st.markdown("### Return on Capital Employed")
+        roe = ratios_df.loc[ratios_df["Metric"] == "ROE", "Value"]
+        roce = ratios_df.loc[ratios_df["Metric"] == "ROCE", "Value"]
+        col3, col4 = st.columns(2)
+
+        with col3:
+            if not roe.empty:
+                 roe_value = roe.values[0]
+                 st.metric("ROE (%)", roe_value)
+                 if roe_value > 15:
+                    st.success("Return on equity is strong, reflecting efficient use of shareholder capital.")
+                 else:
+                    st.warning("Return on equity is moderate, indicating scope for improved capital efficiency.")
+        
+        with col4:
+                    if not roce.empty:
+                        roce_value = roce.values[0]
+                        st.metric("ROCE (%)", roce_value)
 
-            
-        with tabs[4]:
-            st.subheader("Financial Position")
-            bs_df = balance_df.sort_values("Year")
-            st.markdown("### Balance Sheet Scale")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if "Total Assets" in bs_df.columns:
-                    st.area_chart(bs_df.set_index(bs_df["Year"].astype(str))["Total Assets"])
-                    assets = bs_df["Total Assets"].dropna()
-                    if len(assets) >= 3:
-                        assets_growth = assets.pct_change().dropna()
-                        if assets.iloc[-1] > assets.iloc[0]:
-                            st.success("Total assets have expanded over time, indicating growth in the company’s balance sheet size.")
-                        else:
-                            st.warning("Balance sheet size has remained flat, indicating limited asset expansion.")
-                    else:
-                        st.info("Insufficient data to assess asset growth")
-
-            with col2:
-                if "Total Liabilities" in bs_df.columns:
-                    st.line_chart(bs_df.set_index(bs_df["Year"].astype(str))["Total Liabilities"])
-                    liabilities = bs_df["Total Liabilities"].dropna()
-                    if len(liabilities) >= 3:
-                        liabilities_growth = liabilities.pct_change().dropna()
-                        if liabilities.iloc[-1] > liabilities.iloc[0]:
-                            st.warning("Total liabilities have increased over time, indicating rising financial obligations.")
+                        if roce_value > 15:
+                            st.success("ROCE is healthy, indicating effective deployment of long-term capital.")
                         else:
-                            st.success("Total liabilities have remained stable, suggesting controlled financial risk.")
-                    else:
-                        st.info("Insufficient data to assess liability trend.")
-
-            st.markdown("### Capital Structure & Leverage")
-            if "Borrowings" in bs_df.columns:
-                st.line_chart(bs_df.set_index(bs_df["Year"].astype(str))["Borrowings"])
-                debt = bs_df["Borrowings"].dropna()
-                if len(debt)>=3:
-                    debt_growth = debt.pct_change().dropna()
-                    if debt.iloc[-1] > debt.iloc[0]:
-                        st.warning("Borrowings have increased over time, suggesting greater reliance on external funding.")
-                    else:
-                        st.success("Borrowings have reduced or remained stable, indicating improving balance sheet strength.")
-                else:
-                    st.caption("Insufficient data to assess leverage trend.")
+                            st.warning("ROCE is relatively low, suggesting suboptimal capital utilization.")
 
-            st.markdown("### Reserves & Financial Cushion")
-
-            if "Reserves" in bs_df.columns:
-                st.line_chart( bs_df.set_index(bs_df["Year"].astype(str))["Reserves"])
-                reserves = bs_df["Reserves"].dropna()
-                if len(reserves) >= 3:
-                    reserves_growth = reserves.pct_change().dropna()
-                    if reserves.iloc[-1] > reserves.iloc[0]:
-                        st.success("Reserves have grown consistently, strengthening the company’s financial cushion.")
+        
+    def render_financial_position():
+        st.subheader("Financial Position")
+        bs_df = balance_df
+        metrics = derived_metrics().iloc[0]
+        st.markdown("### Balance Sheet Scale")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if "Total Assets" in bs_df.columns:
+                st.area_chart(bs_df.set_index(bs_df["Year"].astype(str))["Total Assets"])
+                if metrics["Total Assets", "count"] >= 3:
+                    if metrics["Total Assets", "last"] > metrics["Total Assets", "first"]:
+                        st.success("Total assets have expanded over time, indicating growth in the company’s balance sheet size.")
                     else:
-                        st.warning("Reserves growth appears limited, reducing internal financial flexibility.")
-
+                        st.warning("Balance sheet size has remained flat, indicating limited asset expansion.")
                 else:
-                    st.info("Insufficient data to assess reserves trend.")
-            
-
-            st.markdown("### Funding Quality Assessment")
-
-            if "Borrowings" in bs_df.columns and "Reserves" in bs_df.columns:
-                        
-                        comparison_df = pd.DataFrame({"Growth Type": ["Borrowings Growth", "Reserves Growth"],
-                                                      "Average Growth Rate": [debt_growth.mean(),reserves_growth.mean()]}).dropna()
-
-                        st.bar_chart(comparison_df.set_index("Growth Type"))
-
-                        if debt_growth.mean() > reserves_growth.mean():
-                            st.warning("Borrowings are growing faster than reserves, indicating debt-led balance sheet expansion.")
-            
-                        else:
-                            st.success("Reserves are growing at least as fast as borrowings, indicating internally funded balance sheet strength.")
-
-
-
-        with tabs[5]:
-            st.subheader("Cash Flow Quality")
-            cf_df = cashflow_df.sort_values("Year")
-
-            st.markdown("### Operating Cash Flow Strength")
-
-            if "Cash from Operating Activity" in cf_df.columns:
-                st.area_chart(cf_df.set_index(cf_df["Year"].astype(str))["Cash from Operating Activity"])
-                ocf = cf_df["Cash from Operating Activity"].dropna()
-                if len(ocf) >= 3:
-                    if ocf.iloc[-1] > ocf.iloc[0]:
-                        st.success("Operating cash flows have strengthened over time, indicating improving cash-generating ability of core operations.")
+                    st.info("Insufficient data to assess asset growth")
+
+        with col2:
+            if "Total Liabilities" in bs_df.columns:
+                st.line_chart(bs_df.set_index(bs_df["Year"].astype(str))["Total Liabilities"])
+                if metrics["Total Liabilities", "count"] >= 3:
+                    if metrics["Total Liabilities", "last"] > metrics["Total Liabilities", "first"]:
+                        st.warning("Total liabilities have increased over time, indicating rising financial obligations.")
                     else:
-                        st.warning("Operating cash flows appear weak or inconsistent, raising concerns around earnings quality.")
+                        st.success("Total liabilities have remained stable, suggesting controlled financial risk.")
                 else:
-                    st.info("Insufficient data to assess operating cash flow trend.")
+                    st.info("Insufficient data to assess liability trend.")
+
+        st.markdown("### Capital Structure & Leverage")
+        if "Borrowings" in bs_df.columns:
+            st.line_chart(bs_df.set_index(bs_df["Year"].astype(str))["Borrowings"])
+            if metrics["Borrowings", "count"] >= 3:
+                if metrics["Borrowings", "last"] > metrics["Borrowings", "first"]:
+                    st.warning("Borrowings have increased over time, suggesting greater reliance on external funding.")
+                else:
+                    st.success("Borrowings have reduced or remained stable, indicating improving balance sheet strength.")
+            else:
+                st.caption("Insufficient data to assess leverage trend.")
 
+        st.markdown("### Reserves & Financial Cushion")
 
+        if "Reserves" in bs_df.columns:
+            st.line_chart( bs_df.set_index(bs_df["Year"].astype(str))["Reserves"])
+            if metrics["Reserves", "count"] >= 3:
+                if metrics["Reserves", "last"] > metrics["Reserves", "first"]:
+                    st.success("Reserves have grown consistently, strengthening the company’s financial cushion.")
+                else:
+                    st.warning("Reserves growth appears limited, reducing internal financial flexibility.")
 
+            else:
+                st.info("Insufficient data to assess reserves trend.")
+        
 
-            st.markdown("### Profit vs Cash Flow Quality")
+        st.markdown("### Funding Quality Assessment")
 
-            if "Cash from Operating Activity" in cf_df.columns and "Net Profit" in cf_df.columns:
-                st.line_chart(cf_df.set_index(cf_df["Year"].astype(str))[["Net Profit", "Cash from Operating Activity"]])
-                profit = cf_df["Net Profit"].dropna()
-                ocf = cf_df["Cash from Operating Activity"].dropna()
+        if "Borrowings" in bs_df.columns and "Reserves" in bs_df.columns:
+                    
+                    comparison_df = pd.DataFrame({"Growth Type": ["Borrowings Growth", "Reserves Growth"],
+                                                  "Average Growth Rate": [metrics["Borrowings", "growth_mean"], metrics["Reserves", "growth_mean"]]}).dropna()
 
-                if len(profit) >= 3 and len(ocf) >= 3:
-                    cash_conversion = (ocf / profit).mean()
+                    st.bar_chart(comparison_df.set_index("Growth Type"))
 
-                    if cash_conversion > 1:
-                        st.success("Operating cash flows exceed accounting profits, indicating high earnings quality and conservative accounting.")
-                    elif cash_conversion > 0.8:
-                        st.info( "Operating cash flows broadly track profits, indicating reasonable earnings quality.")
-                        
+                    if metrics["Borrowings", "growth_mean"] > metrics["Reserves", "growth_mean"]:
+                        st.warning("Borrowings are growing faster than reserves, indicating debt-led balance sheet expansion.")
+        
                     else:
-                        st.warning("Operating cash flows lag profits, suggesting aggressive accounting or working capital stress.")
-                        
-
+                        st.success("Reserves are growing at least as fast as borrowings, indicating internally funded balance sheet strength.")
 
 
-            st.markdown("### Free Cash Flow Health")
 
-            if "Cash from Operating Activity" in cf_df.columns and "Cash from Investing Activity" in cf_df.columns:
-                cf_df["Free Cash Flow"] = (cf_df["Cash from Operating Activity"] + cf_df["Cash from Investing Activity"])
+    def render_cash_flow():
+        st.subheader("Cash Flow Quality")
+        cf_df = cashflow_df
+        metrics = derived_metrics().iloc[0]
 
-                st.line_chart( cf_df.set_index(cf_df["Year"].astype(str))["Free Cash Flow"])
-                fcf = cf_df["Free Cash Flow"].dropna()
-
-                if len(fcf) >= 3:
-                    if fcf.mean() > 0:
-                        st.success(
-                            "Free cash flow is positive on average,indicating the business can fund growth internally.")
-                    else:
-                        st.warning(
-                            "Free cash flow remains negative, suggesting dependence on external funding.")
+        st.markdown("### Operating Cash Flow Strength")
 
+        if "Cash from Operating Activity" in cf_df.columns:
+            st.area_chart(cf_df.set_index(cf_df["Year"].astype(str))["Cash from Operating Activity"])
+            if metrics["Operating Cash Flow", "count"] >= 3:
+                if metrics["Operating Cash Flow", "last"] > metrics["Operating Cash Flow", "first"]:
+                    st.success("Operating cash flows have strengthened over time, indicating improving cash-generating ability of core operations.")
+                else:
+                    st.warning("Operating cash flows appear weak or inconsistent, raising concerns around earnings quality.")
+            else:
+                st.info("Insufficient data to assess operating cash flow trend.")
 
 
-            st.markdown("### Cash Flow Structure")
 
-            required_cols = ["Cash from Operating Activity","Cash from Investing Activity","Cash from Financing Activity"]
-            if all(col in cf_df.columns for col in required_cols):
 
-                avg_cf_df = pd.DataFrame({"Cash Flow Type": ["Operating","Investing","Financing"],
-                                        "Average Cash Flow": [cf_df["Cash from Operating Activity"].mean(),cf_df["Cash from Investing Activity"].mean(),cf_df["Cash from Financing Activity"].mean()]})
-            
+        st.markdown("### Profit vs Cash Flow Quality")
 
-                st.bar_chart(avg_cf_df.set_index("Cash Flow Type")["Average Cash Flow"])
+        if "Cash from Operating Activity" in cf_df.columns and "Net Profit" in cf_df.columns:
+            st.line_chart(cf_df.set_index(cf_df["Year"].astype(str))[["Net Profit", "Cash from Operating Activity"]])
+            if metrics["Cash Flow Net Profit", "count"] >= 3 and metrics["Operating Cash Flow", "count"] >= 3:
+                cash_conversion = metrics["OCF Conversion", "mean"]
 
-                if avg_cf_df.loc[0, "Average Cash Flow"] > 0:
-                    st.success("Operating activities are the primary source of cash, which is a healthy cash flow structure.")
+                if cash_conversion > 1:
+                    st.success("Operating cash flows exceed accounting profits, indicating high earnings quality and conservative accounting.")
+                elif cash_conversion > 0.8:
+                    st.info( "Operating cash flows broadly track profits, indicating reasonable earnings quality.")
+                    
                 else:
-                    st.warning("Operating activities are not generating sufficient cash, raising concerns around business sustainability.")
-    
-        with tabs[6]:
-            st.subheader("Shareholding Pattern")
+                    st.warning("Operating cash flows lag profits, suggesting aggressive accounting or working capital stress.")
+                    
 
-            sh_df = shareholding_df.sort_values("Year")
 
 
-            st.markdown("### Promoter Holding Trend")
+        st.markdown("### Free Cash Flow Health")
 
-            if "Promoters" in sh_df.columns:
-                st.markdown("#### Promoter Shareholding (%)")
-                st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["Promoters"])
-                promoters = sh_df["Promoters"].dropna()
+        if "Cash from Operating Activity" in cf_df.columns and "Cash from Investing Activity" in cf_df.columns:
+            fcf = memoized(analysis_window, "free_cash_flow", lambda: metric_series(windowed, "Free Cash Flow")
+                           .droplevel("Company").rename(index=str).rename("Free Cash Flow"))
 
-                if len(promoters) >= 3:
-                    if promoters.iloc[-1] > promoters.iloc[0]:
-                        st.success("Promoter holding has increased over time, indicating rising promoter confidence and commitment.")         
-                    elif promoters.iloc[-1] < promoters.iloc[0]:
-                        st.warning("Promoter holding has declined, which may indicate stake dilution or partial exit.")   
-                    else:
-                        st.info("Promoter holding has remained broadly stable.")
+            st.line_chart(fcf)
+
+            if metrics["Free Cash Flow", "count"] >= 3:
+                if metrics["Free Cash Flow", "mean"] > 0:
+                    st.success(
+                        "Free cash flow is positive on average,indicating the business can fund growth internally.")
                 else:
-                    st.info("Insufficient data to assess promoter holding trend.")
+                    st.warning(
+                        "Free cash flow remains negative, suggesting dependence on external funding.")
 
 
 
-            st.markdown("### Institutional Participation")
+        st.markdown("### Cash Flow Structure")
 
-            col1, col2 = st.columns(2)
+        required_cols = ["Cash from Operating Activity","Cash from Investing Activity","Cash from Financing Activity"]
+        if all(col in cf_df.columns for col in required_cols):
 
-            with col1:
-                if "FIIs" in sh_df.columns:
-                    st.markdown("#### Foreign Institutional Holding (%)")
-                    st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["FIIs"])
-                    fii = sh_df["FIIs"].dropna()
-                    if len(fii) >= 3:
-                        if fii.iloc[-1] > fii.iloc[0]:
-                            st.success("Foreign institutional participation has increased, reflecting improving global investor confidence.")
-                        else:
-                            st.warning("Foreign institutional holding has declined, possibly reflecting external risk aversion.")
-                    else:
-                        st.info("Insufficient data to assess FII trend.")
+            avg_cf_df = pd.DataFrame({"Cash Flow Type": ["Operating","Investing","Financing"],
+                                    "Average Cash Flow": [metrics["Operating Cash Flow", "mean"], metrics["Investing Cash Flow", "mean"], metrics["Financing Cash Flow", "mean"]]})
+        
 
+            st.bar_chart(avg_cf_df.set_index("Cash Flow Type")["Average Cash Flow"])
 
-            with col2:
-                if "DIIs" in sh_df.columns:
-                    st.markdown("#### Domestic Institutional Holding (%)")
-                    st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["DIIs"])
-                    dii = sh_df["DIIs"].dropna()
-                    if len(dii) >= 3:
-                        if dii.iloc[-1] > dii.iloc[0]:
-                            st.success("Domestic institutional holding has increased, indicating rising confidence among local professionals.")
-                        else:
-                            st.warning("Domestic institutional participation has weakened.")
-                    else:
-                        st.info("Insufficient data to assess DII trend.")
+            if avg_cf_df.loc[0, "Average Cash Flow"] > 0:
+                st.success("Operating activities are the primary source of cash, which is a healthy cash flow structure.")
+            else:
+                st.warning("Operating activities are not generating sufficient cash, raising concerns around business sustainability.")
 
+    def render_shareholding():
+        st.subheader("Shareholding Pattern")
 
-            st.markdown("### Public Shareholding")
+        sh_df = shareholding_df
+        metrics = derived_metrics().iloc[0]
 
-            if "Public" in sh_df.columns:
-                st.markdown("#### Public Shareholding (%)")
-                st.area_chart(sh_df.set_index(sh_df["Year"].astype(str))["Public"])
 
-                public = sh_df["Public"].dropna()
+        st.markdown("### Promoter Holding Trend")
 
-                if len(public) >= 3:
-                    if public.iloc[-1] > public.iloc[0]:
-                        st.info("Public shareholding has increased, indicating wider retail participation or promoter dilution.")
-                    else:
-                        st.info("Public shareholding has declined, possibly due to increased institutional ownership.")
+        if "Promoters" in sh_df.columns:
+            st.markdown("#### Promoter Shareholding (%)")
+            st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["Promoters"])
+            if metrics["Promoters", "count"] >= 3:
+                if metrics["Promoters", "last"] > metrics["Promoters", "first"]:
+                    st.success("Promoter holding has increased over time, indicating rising promoter confidence and commitment.")         
+                elif metrics["Promoters", "last"] < metrics["Promoters", "first"]:
+                    st.warning("Promoter holding has declined, which may indicate stake dilution or partial exit.")   
                 else:
-                    st.info("Insufficient data to assess public shareholding trend.")
-
+                    st.info("Promoter holding has remained broadly stable.")
+            else:
+                st.info("Insufficient data to assess promoter holding trend.")
 
-        with tabs[7]:
-                st.subheader(f"Executive Financial Summary – {company_name}")
 
-                strengths = []
-                risks = []
 
+        st.markdown("### Institutional Participation")
 
-                # 1. GROWTH QUALITY (0–20)
+        col1, col2 = st.columns(2)
 
-                growth_score = 14
+        with col1:
+            if "FIIs" in sh_df.columns:
+                st.markdown("#### Foreign Institutional Holding (%)")
+                st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["FIIs"])
+                if metrics["FIIs", "count"] >= 3:
+                    if metrics["FIIs", "last"] > metrics["FIIs", "first"]:
+                        st.success("Foreign institutional participation has increased, reflecting improving global investor confidence.")
+                    else:
+                        st.warning("Foreign institutional holding has declined, possibly reflecting external risk aversion.")
+                else:
+                    st.info("Insufficient data to assess FII trend.")
 
-                if "Sales" in pnl_y_df.columns and "Net Profit" in pnl_y_df.columns:
-                    sales = pnl_y_df.sort_values("Year")["Sales"].dropna()
-                    profit = pnl_y_df.sort_values("Year")["Net Profit"].dropna()
 
-                    if len(sales) >= 3 and len(profit) >= 3:
-                        if sales.iloc[-1] > sales.iloc[0] and profit.iloc[-1] > profit.iloc[0]:
-                            growth_score = 16
-                            strengths.append("Revenue and profits have grown consistently.")
-                        elif sales.iloc[-1] > sales.iloc[0] and profit.iloc[-1] <= profit.iloc[0]:
-                            growth_score = 10
-                            risks.append("Revenue growth has not translated into profit growth.")
-                        else:
-                            growth_score = 8
-                            risks.append("Business growth momentum appears weak or inconsistent.")
+        with col2:
+            if "DIIs" in sh_df.columns:
+                st.markdown("#### Domestic Institutional Holding (%)")
+                st.line_chart(sh_df.set_index(sh_df["Year"].astype(str))["DIIs"])
+                if metrics["DIIs", "count"] >= 3:
+                    if metrics["DIIs", "last"] > metrics["DIIs", "first"]:
+                        st.success("Domestic institutional holding has increased, indicating rising confidence among local professionals.")
+                    else:
+                        st.warning("Domestic institutional participation has weakened.")
+                else:
+                    st.info("Insufficient data to assess DII trend.")
 
 
-                # 2. PROFITABILITY & EFFICIENCY (0–20)
+        st.markdown("### Public Shareholding")
 
-                profitability_score = 14
+        if "Public" in sh_df.columns:
+            st.markdown("#### Public Shareholding (%)")
+            st.area_chart(sh_df.set_index(sh_df["Year"].astype(str))["Public"])
 
-                is_cyclical = False
+            if metrics["Public", "count"] >= 3:
+                if metrics["Public", "last"] > metrics["Public", "first"]:
+                    st.info("Public shareholding has increased, indicating wider retail participation or promoter dilution.")
+                else:
+                    st.info("Public shareholding has declined, possibly due to increased institutional ownership.")
+            else:
+                st.info("Insufficient data to assess public shareholding trend.")
 
-                if "OPM %" in pnl_y_df.columns:
-                    margins = pnl_y_df.sort_values("Year")["OPM %"].dropna()
 
-                    if len(margins) >= 3:
-                        margin_change = margins.iloc[-1] - margins.iloc[0]
+    def render_peers():
+        st.subheader("Peer Comparison")
 
-                        # Detect cyclicality via margin volatility
-                        if margins.std() > 5:
-                            is_cyclical = True
+        industry = dataset.get("industry")
+        if not industry:
+            st.info("Industry classification is not available for this company.")
+            return
 
-                        if margin_change > 1:
-                            profitability_score = 16
-                            strengths.append("Operating margins have expanded.")
-                        elif margin_change >= -2:
-                            profitability_score = 15
-                            strengths.append("Operating margins have remained broadly stable.")
-                        else:
-                            profitability_score = 9
-                            risks.append("Operating margins have seen sustained pressure.")
+        st.markdown(f"Industry: [{industry['name']}]({industry['url']})")
 
-                # ---- ROE / ROCE quality boost ----
-                roe = ratios_df.loc[ratios_df["Metric"] == "ROE", "Value"]
-                roce = ratios_df.loc[ratios_df["Metric"] == "ROCE", "Value"]
+        if st.button("Compare with Industry Peers"):
+            st.session_state.compare_peers = url
 
-                if not roe.empty and not roce.empty:
-                    if roe.values[0] >= 18 and roce.values[0] >= 18:
-                        profitability_score = min(profitability_score + 2, 20)
-                        strengths.append("Strong ROE and ROCE indicate efficient capital usage.")
+        if st.session_state.get("compare_peers") != url:
+            st.caption("Fetches the largest companies of the same industry and ranks them on returns, margins, growth and leverage.")
+            return
 
+        with st.spinner("Fetching peer financial data..."):
+            comparison = memoized(analysis_window, "peers", lambda: compare_peers(url, dataset, analysis_window))
 
-                # 3. FINANCIAL POSITION (0–20)
+        metrics = comparison["metrics"]
+        ranks = comparison["ranks"]
 
-                balance_score = 14
+        st.markdown(f"### Percentile Rank among {len(metrics)} Companies")
+        st.caption("100 is the best value in the peer set; for debt to equity, lower ranks better.")
 
-                balance_df.columns = balance_df.columns.str.replace("+", "", regex=False).str.strip()
+        columns = st.columns(len(PEER_METRICS))
+        for column, metric in zip(columns, PEER_METRICS):
+            value = metrics.loc[comparison["company"], metric]
+            rank = ranks.loc[comparison["company"], metric]
+            column.metric(metric, "NA" if pd.isna(value) else f"{value:.2f}", None if pd.isna(rank) else f"{rank:.0f} pct", delta_color="off")
 
-                if "Borrowings" in balance_df.columns and "Reserves" in balance_df.columns:
-                    debt = balance_df["Borrowings"]
-                    reserves = balance_df["Reserves"].dropna()
+        st.markdown("### Peer Set")
+        st.dataframe(metrics.join(ranks, rsuffix=" (pct)").sort_values("ROCE", ascending=False))
 
-                    # Absolute (not %) leverage logic
-                    if debt.isna().all() or debt.max(skipna=True) <= 0.1 * reserves.max():
-                        balance_score = 18
-                        strengths.append("Minimal leverage supported by a strong reserve base.")
-                    else:
-                        debt = debt.dropna()
-                        if len(debt) >= 3 and len(reserves) >= 3:
-                            if reserves.diff().mean() >= debt.diff().mean():
-                                balance_score = 16
-                                strengths.append("Balance sheet growth is largely internally funded.")
-                            else:
-                                balance_score = 9
-                                risks.append("Borrowings are rising faster than internal reserves.")
-
-
-                # 4. CASH FLOW QUALITY (0–20)
-
-                cashflow_score = 15
-
-                ocf_col = None
-                for col in cashflow_df.columns:
-                    if "operating" in col.lower() and "cash" in col.lower():
-                        ocf_col = col
-                        break
-
-                if ocf_col and "Net Profit" in cashflow_df.columns:
-                    ocf = cashflow_df.sort_values("Year")[ocf_col].dropna()
-                    profit = cashflow_df.sort_values("Year")["Net Profit"].dropna()
-
-                    if len(ocf) >= 3 and len(profit) >= 3:
-                        if (ocf > profit).sum() >= len(ocf) - 1:
-                            cashflow_score = 20
-                            strengths.append("Operating cash flows consistently exceed reported profits.")
-                        elif (ocf / profit).mean() >= 0.8:
-                            cashflow_score = 17
-                            strengths.append("Profits are well supported by operating cash flows.")
-                        else:
-                            cashflow_score = 9
-                            risks.append("Weak cash conversion relative to reported profits.")
+        if not comparison["errors"].empty:
+            st.warning(f"{len(comparison['errors'])} peers could not be loaded.")
+            st.dataframe(comparison["errors"])
 
 
-                # 5. GOVERNANCE & OWNERSHIP (0–20)
+    def render_compare():
+        st.subheader("Compare Companies")
 
-                governance_score = 14
+        own = normalize_company_url(url)
+        cached = [other for other in cached_company_urls() if normalize_company_url(other) != own]
+        selected = st.multiselect("Companies already loaded", cached, format_func=normalize_company_url)
+        typed = st.text_area("More Screener company URLs, one per line")
 
-                if "Promoters" in shareholding_df.columns:
-                    promoters = shareholding_df.sort_values("Year")["Promoters"].dropna()
+        if st.button("Compare Companies"):
+            others = selected + [line.strip() for line in typed.splitlines() if line.strip()]
+            st.session_state.compare_urls = [url] + [other for other in dict.fromkeys(others) if normalize_company_url(other) != own]
 
-                    if len(promoters) >= 3:
-                        change = promoters.iloc[-1] - promoters.iloc[0]
+        compare_urls = st.session_state.get("compare_urls")
+        if not compare_urls or compare_urls[0] != url or len(compare_urls) < 2:
+            st.caption("Pick at least one other company to chart against this one.")
+            return
 
-                        if change >= -1.0:
-                            governance_score = 16
-                            strengths.append("Promoter shareholding has remained broadly stable.")
-                        else:
-                            governance_score = 9
-                            risks.append("Declining promoter shareholding observed.")
+        with st.spinner("Fetching company financial data..."):
+            comparison = memoized(analysis_window, ("compare", tuple(compare_urls)), lambda: compare_companies(compare_urls, analysis_window))
 
+        # Year × Company per metric, already aligned on one Year axis.
+        values = comparison["values"].set_index(["Metric", "Year", "Company"])["Value"].unstack("Company")
+        for metric in COMPARE_METRICS:
+            st.markdown(f"### {metric}")
+            st.line_chart(values.loc[metric])
 
-             
+        if not comparison["errors"].empty:
+            st.warning(f"{len(comparison['errors'])} companies could not be loaded.")
+            st.dataframe(comparison["errors"])
 
-                confidence_score = (growth_score + profitability_score + balance_score + cashflow_score + governance_score )
 
+    def render_screen():
+        st.subheader("Screen Stored Companies")
+        st.caption("Runs one query over every company in the financial store, e.g. \"ROCE > 18, 5-year Sales CAGR > 12%, Borrowings falling, Promoters stable\". Conditions without their own N-year use the analysis window.")
 
-                quality_checks = 0
-                if cashflow_score >= 16:
-                    quality_checks += 1
-                if balance_score >= 15:
-                    quality_checks += 1
-                if profitability_score >= 14:
-                    quality_checks += 1
-                if governance_score >= 14:
-                    quality_checks += 1
+        query = st.text_input("Screen", value="ROCE > 18, 5-year Sales CAGR > 12%, Borrowings falling, Promoters stable")
+        rebuild = st.button("Rebuild Universe")
 
-                if quality_checks >= 3 and not is_cyclical:
-                    confidence_score += 10
-                    strengths.append("The company exhibits characteristics of a high-quality, resilient business franchise.")
+        with st.spinner("Loading stored companies..."):
+            universe = universe_cache.get(rebuild=rebuild)
 
-                # =========================================================
-                # DISPLAY
-                # =========================================================
-                st.markdown("### Overall Financial Confidence")
-                st.write(f"**Confidence Score:** {confidence_score}/100")
+        if not len(universe.companies):
+            st.info("No companies stored yet. Companies appear here once they have been analyzed or batch-loaded.")
+            return
 
-                if confidence_score >= 80:
-                    st.success("Strong and sustainable financial profile.")
-                elif confidence_score >= 60:
-                    st.warning("Moderate financial strength with some areas to monitor.")
-                else:
-                    st.error("Weak sustainability and elevated financial risk.")
+        try:
+            start = time.perf_counter()
+            results = screen(query, universe, ANALYSIS_WINDOWS[analysis_window])
+            elapsed = time.perf_counter() - start
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        total = len(universe.companies)
+        st.caption(f"{len(results)} of {total} companies match ({elapsed * 1000:.0f} ms)")
+        st.dataframe(results)
+
+        if universe.skipped:
+            st.warning(f"{len(universe.skipped)} stored companies could not be loaded and are not screened.")
+            st.dataframe(pd.DataFrame(universe.skipped, columns=["URL", "Error"]))
+
+
+    def render_executive():
+            st.subheader(f"Executive Financial Summary – {company_name}")
+
+            score = memoized(analysis_window, "score", lambda: score_company(windowed, derived_metrics()))
+            confidence_score = score["confidence_score"]
+            strengths = score["strengths"]
+            risks = score["risks"]
+
+            # =========================================================
+            # DISPLAY
+            # =========================================================
+            st.markdown("### Overall Financial Confidence")
+            st.write(f"**Confidence Score:** {confidence_score}/100")
+
+            if confidence_score >= 80:
+                st.success("Strong and sustainable financial profile.")
+            elif confidence_score >= 60:
+                st.warning("Moderate financial strength with some areas to monitor.")
+            else:
+                st.error("Weak sustainability and elevated financial risk.")
 
-                st.markdown("### Key Strengths")
-                for s in strengths[:5]:
-                    st.write(f"• {s}")
+            st.markdown("### Key Strengths")
+            for s in strengths[:5]:
+                st.write(f"• {s}")
 
-                st.markdown("### Key Risks & Watchpoints")
-                for r in risks[:5]:
-                    st.write(f"• {r}")
+            st.markdown("### Key Risks & Watchpoints")
+            for r in risks[:5]:
+                st.write(f"• {r}")
+    
+    def render_exit():
+        st.subheader("Exit & Session Summary")
+
+        st.header(" Key KPIs Used in the Financial Diagnostic System")
+        st.markdown("This page summarizes the key financial metrics analyzed across different dimensions to arrive at the final diagnostic insights.")
+        st.divider()
+
+        # Growth & Performance KPIs
+        st.subheader(" Growth & Performance")
+        st.markdown("""
+        - Revenue (Yearly)
+        - Revenue (Quarterly)
+        - Net Profit (Yearly)
+        - Net Profit (Quarterly)
+        - Earnings Per Share (EPS)
+        - Revenue Growth Trend
+        - Profit Growth Trend
+        """)
+
+        # Profitability & Efficiency KPIs
+        st.subheader(" Profitability & Efficiency")
+        st.markdown("""
+        - Operating Profit
+        - Operating Margin
+        - Net Profit Margin
+        - Return on Equity (ROE)
+        - Return on Capital Employed (ROCE)
+        - Operating vs Net Profit Spread
+        """)
+
+        # Financial Position KPIs
+        st.subheader("Financial Position (Balance Sheet)")
+        st.markdown("""
+        - Total Assets
+        - Total Liabilities
+        - Borrowings
+        - Reserves & Surplus
+        - Assets vs Liabilities Trend
+        - Borrowings vs Reserves Trend
+        """)
+
+        # Cash Flow Quality KPIs
+        st.subheader(" Cash Flow Quality")
+        st.markdown("""
+        - Operating Cash Flow (OCF)
+        - Free Cash Flow (FCF)
+        - Investing Cash Flow
+        - Financing Cash Flow
+        - Profit vs Cash Flow Alignment
+        """)
+
+        # Shareholding KPIs
+        st.subheader(" Shareholding & Ownership")
+        st.markdown("""
+        - Promoter Holding (%)
+        - Foreign Institutional Investors (FII %)
+        - Domestic Institutional Investors (DII %)
+        - Public Shareholding (%)
+        - Ownership Stability Trend
+        """)
+
+        # Market & Return Context
+        st.subheader(" Market & Return Context")
+        st.markdown("""
+        - Market Capitalization
+        - Current Stock Price
+        - Dividend Yield
+        - Book Value per Share
+        - 52-Week High / Low
+        """)
+
+        # Composite Indicators
+        st.subheader(" Composite & Summary Indicators")
+        st.markdown("""
+        - Financial Confidence Score
+        - Growth Consistency Indicator
+        - Profitability Quality Indicator
+        - Balance Sheet Strength Indicator
+        - Cash Flow Sustainability Indicator
+        """)
+
+        st.divider()
+
+        st.markdown("> *These KPIs collectively provide a structured, multi-dimensional view of a company's financial health across growth, profitability, stability, cash flow quality, and ownership.*")
+
+        st.divider()
+
+        st.markdown(
+            """
+            ### Thank You for Using the Company Financial Diagnostics System  
+
+            You have successfully completed a structured financial analysis using:
+            - Multi-year financial statements  
+            - Cash flow diagnostics  
+            - Balance sheet strength checks  
+            - Ownership and governance signals  
+
+            This tool is designed to support **analyst-style decision making**, not stock tips.
+            """
+        )
+
+        st.divider()
         
-        with tabs[8]:
-            st.subheader("Exit & Session Summary")
-
-            st.header(" Key KPIs Used in the Financial Diagnostic System")
-            st.markdown("This page summarizes the key financial metrics analyzed across different dimensions to arrive at the final diagnostic insights.")
-            st.divider()
-
-            # Growth & Performance KPIs
-            st.subheader(" Growth & Performance")
-            st.markdown("""
-            - Revenue (Yearly)
-            - Revenue (Quarterly)
-            - Net Profit (Yearly)
-            - Net Profit (Quarterly)
-            - Earnings Per Share (EPS)
-            - Revenue Growth Trend
-            - Profit Growth Trend
-            """)
-
-            # Profitability & Efficiency KPIs
-            st.subheader(" Profitability & Efficiency")
-            st.markdown("""
-            - Operating Profit
-            - Operating Margin
-            - Net Profit Margin
-            - Return on Equity (ROE)
-            - Return on Capital Employed (ROCE)
-            - Operating vs Net Profit Spread
-            """)
-
-            # Financial Position KPIs
-            st.subheader("Financial Position (Balance Sheet)")
-            st.markdown("""
-            - Total Assets
-            - Total Liabilities
-            - Borrowings
-            - Reserves & Surplus
-            - Assets vs Liabilities Trend
-            - Borrowings vs Reserves Trend
-            """)
-
-            # Cash Flow Quality KPIs
-            st.subheader(" Cash Flow Quality")
-            st.markdown("""
-            - Operating Cash Flow (OCF)
-            - Free Cash Flow (FCF)
-            - Investing Cash Flow
-            - Financing Cash Flow
-            - Profit vs Cash Flow Alignment
-            """)
-
-            # Shareholding KPIs
-            st.subheader(" Shareholding & Ownership")
-            st.markdown("""
-            - Promoter Holding (%)
-            - Foreign Institutional Investors (FII %)
-            - Domestic Institutional Investors (DII %)
-            - Public Shareholding (%)
-            - Ownership Stability Trend
-            """)
-
-            # Market & Return Context
-            st.subheader(" Market & Return Context")
-            st.markdown("""
-            - Market Capitalization
-            - Current Stock Price
-            - Dividend Yield
-            - Book Value per Share
-            - 52-Week High / Low
-            """)
-
-            # Composite Indicators
-            st.subheader(" Composite & Summary Indicators")
-            st.markdown("""
-            - Financial Confidence Score
-            - Growth Consistency Indicator
-            - Profitability Quality Indicator
-            - Balance Sheet Strength Indicator
-            - Cash Flow Sustainability Indicator
-            """)
-
-            st.divider()
-
-            st.markdown("> *These KPIs collectively provide a structured, multi-dimensional view of a company's financial health across growth, profitability, stability, cash flow quality, and ownership.*")
-
-            st.divider()
-
-            st.markdown(
-                """
-                ### Thank You for Using the Company Financial Diagnostics System  
-
-                You have successfully completed a structured financial analysis using:
-                - Multi-year financial statements  
-                - Cash flow diagnostics  
-                - Balance sheet strength checks  
-                - Ownership and governance signals  
-
-                This tool is designed to support **analyst-style decision making**, not stock tips.
-                """
-            )
-
-            st.divider()
-            
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                if st.button("🔄 Start New Analysis"):
-                    st.session_state.data_loaded = False
-                    st.rerun()
-
-            with col2:
-                if st.button("🔒 Logout"):
-                    st.session_state.clear()
-                    st.rerun()
+        col1, col2, col3 = st.columns(3)
 
-            with col3:
-                st.info("You may safely close this browser tab.")
+        with col1:
+            if st.button("🔄 Start New Analysis"):
+                st.session_state.data_loaded = False
+                st.session_state.pop("dataset", None)
+                st.rerun()
 
-            st.divider()
-            st.caption("© Adarsh Gupta | Company Financial Diagnosis System")
+        with col2:
+            if st.button("🔒 Logout"):
+                st.session_state.clear()
+                st.rerun()
 
+        with col3:
+            st.info("You may safely close this browser tab.")
+
+        st.divider()
+        st.caption("© Adarsh Gupta | Company Financial Diagnosis System")
+
+
+    tab_renderers = {
+        "Dataset": render_dataset,
+        "Overview": lambda: render_overview(ratios_df),
+        "Performance & Growth": render_performance,
+        "Profitability & Efficiency": render_profitability,
+        "Financial Position": render_financial_position,
+        "Cash Flow Quality": render_cash_flow,
+        "Shareholding": render_shareholding,
+        "Peer Comparison": render_peers,
+        "Compare Companies": render_compare,
+        "Screen": render_screen,
+        "Executive Page": render_executive,
+        "Exit Page": render_exit,
+    }
 
+    if lazy_tabs:
+        selected_tab = st.radio("Section", list(tab_renderers), horizontal=True, key="selected_tab", label_visibility="collapsed")
+        with stage_timer.time(f"tab: {selected_tab}"):
+            tab_renderers[selected_tab]()
+    else:
+        for (name, render), tab in zip(tab_renderers.items(), st.tabs(list(tab_renderers))):
+            with tab, stage_timer.time(f"tab: {name}"):
+                render()
+
+    # Hidden performance panel, shown with ?diagnostics=1 in the URL. It is
+    # drawn last so that it includes this rerun's tab timings.
+    if st.query_params.get("diagnostics") == "1":
+        with st.sidebar.expander("Diagnostics", expanded=True):
+            st.caption("Stage timings for this process; nested stages (score includes analytics) overlap.")
+            st.dataframe(stage_timer.summary().round(2), hide_index=True)
+
+            for name, cache in cache_counters.items():
+                stats = cache.stats()
+                lookups = stats["hits"] + stats["misses"]
+                hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+                st.caption(f"{name}: {stats['hits']} hits / {stats['misses']} misses ({hit_rate})")
+
+            dataset_bytes = sum(dataset[key].memory_usage(deep=True).sum() for key in dataset if key.endswith("_df"))
+            st.caption(f"Loaded dataset: {dataset_bytes / 1024:.0f} KB in memory")
+            if fetcher.timings:
+                last_fetch = fetcher.timings[-1]
+                st.caption(f"Last page fetch: {last_fetch['bytes'] / 1024:.0f} KB in {last_fetch['seconds'] * 1000:.0f} ms (HTTP {last_fetch['status']})")
+
+            if st.checkbox("Prometheus text"):
+                st.code(prometheus_text(caches=cache_counters), language="text")
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+from timing import timed
+
+
+STATS = ["count", "first", "last", "sum", "mean", "max", "std", "step", "growth_mean", "growth_std", "cagr"]
+
+# Derived metric -> (statement frame, column). None marks the operating cash
+# flow column, whose label varies between companies.
+METRICS = {
+    "Sales": ("pnl_y_df", "Sales"),
+    "Net Profit": ("pnl_y_df", "Net Profit"),
+    "EPS": ("pnl_y_df", "EPS in Rs"),
+    "Operating Profit": ("pnl_y_df", "Operating Profit"),
+    "OPM": ("pnl_y_df", "OPM %"),
+    "Total Assets": ("balance_df", "Total Assets"),
+    "Total Liabilities": ("balance_df", "Total Liabilities"),
+    "Borrowings": ("balance_df", "Borrowings"),
+    "Equity Capital": ("balance_df", "Equity Capital"),
+    "Reserves": ("balance_df", "Reserves"),
+    "Operating Cash Flow": ("cashflow_df", None),
+    "Investing Cash Flow": ("cashflow_df", "Cash from Investing Activity"),
+    "Financing Cash Flow": ("cashflow_df", "Cash from Financing Activity"),
+    "Cash Flow Net Profit": ("cashflow_df", "Net Profit"),
+    "Promoters": ("shareholding_df", "Promoters"),
+    "FIIs": ("shareholding_df", "FIIs"),
+    "DIIs": ("shareholding_df", "DIIs"),
+    "Public": ("shareholding_df", "Public"),
+}
+
+# Ratios and combinations of two statement columns, computed row by row.
+DERIVED = ["Free Cash Flow", "OCF Conversion", "OCF Above Profit", "Profit Conversion"]
+
+
+# -----------------------------
+# Statement Columns
+# -----------------------------
+def find_column(df, name):
+    # Balance sheet labels keep a trailing "+" for expandable rows.
+    for col in df.columns:
+        if col.replace("+", "").strip() == name:
+            return col
+    return None
+
+
+def operating_cash_column(df):
+    for col in df.columns:
+        if "operating" in col.lower() and "cash" in col.lower():
+            return col
+    return None
+
+
+def _column(frames, key, name):
+    df = frames[key]
+    col = operating_cash_column(df) if name is None else find_column(df, name)
+    return None if col is None else df[col]
+
+
+def _rows(df, values):
+    return df["Company"].to_numpy(), df["Year"].to_numpy(), np.asarray(values, dtype=float)
+
+
+def _metric_rows(frames, metric):
+    # One metric as (companies, years, values) arrays, row-wise for the ratios.
+    if metric in METRICS:
+        key, name = METRICS[metric]
+        values = _column(frames, key, name)
+        if values is None:
+            return None
+        return _rows(frames[key], values)
+
+    cashflow_df = frames["cashflow_df"]
+    ocf = _column(frames, "cashflow_df", None)
+
+    if metric == "Free Cash Flow":
+        investing = _column(frames, "cashflow_df", "Cash from Investing Activity")
+        if ocf is None or investing is None:
+            return None
+        return _rows(cashflow_df, ocf + investing)
+
+    if metric in ("OCF Conversion", "OCF Above Profit"):
+        profit = _column(frames, "cashflow_df", "Net Profit")
+        if ocf is None or profit is None:
+            return None
+        return _rows(cashflow_df, ocf / profit if metric == "OCF Conversion" else ocf > profit)
+
+    if metric == "Profit Conversion":
+        profit = _column(frames, "pnl_y_df", "Net Profit")
+        operating = _column(frames, "pnl_y_df", "Operating Profit")
+        if profit is None or operating is None:
+            return None
+        return _rows(frames["pnl_y_df"], profit / operating)
+
+    raise KeyError(metric)
+
+
+def _metric_arrays(frames, metrics):
+    # Metric codes, companies, years and values of every metric, with missing
+    # values dropped.
+    codes, companies, years, values = [np.empty(0, dtype=int)], [np.empty(0, dtype=object)], [np.empty(0)], [np.empty(0)]
+    for code, metric in enumerate(metrics):
+        rows = _metric_rows(frames, metric)
+        if rows is None:
+            continue
+        keep = ~np.isnan(rows[2])
+        codes.append(np.full(keep.sum(), code))
+        companies.append(rows[0][keep])
+        years.append(rows[1][keep])
+        values.append(rows[2][keep])
+
+    return np.concatenate(codes), np.concatenate(companies), np.concatenate(years).astype(float), np.concatenate(values)
+
+
+def metric_values(frames, metrics=None):
+    # Long Metric / Company / Year / Value frame, ordered by metric, company
+    # and Year.
+    metrics = list(METRICS) + DERIVED if metrics is None else metrics
+    codes, companies, years, values = _metric_arrays(frames, metrics)
+
+    order = np.lexsort((years, pd.factorize(companies)[0], codes))
+    return pd.DataFrame({
+        "Metric": np.asarray(metrics, dtype=object)[codes[order]],
+        "Company": companies[order],
+        "Year": years[order].astype(int),
+        "Value": values[order],
+    })
+
+
+def metric_series(frames, metric):
+    # (Company, Year)-indexed values of one metric, in Year order.
+    return metric_values(frames, [metric]).set_index(["Company", "Year"])["Value"]
+
+
+# -----------------------------
+# Derived Metrics
+# -----------------------------
+@timed("analytics")
+def derive_metrics(frames):
+    # Company × (metric, stat) frame built once per windowed dataset (or a
+    # stack of them) in one vectorized pass over every metric. Series are
+    # taken in Year order with missing years skipped, so tabs and the scorer
+    # see the same growth, CAGR, margin, conversion and volatility numbers.
+    companies = pd.Index(
+        pd.concat([frames[key]["Company"] for key in ["pnl_y_df", "balance_df", "cashflow_df", "shareholding_df"]]).drop_duplicates(),
+        name="Company",
+    )
+    metrics = list(METRICS) + DERIVED
+
+    table = np.full((len(companies), len(metrics), len(STATS)), np.nan)
+    table[:, :, [STATS.index("count"), STATS.index("sum")]] = 0
+
+    codes, company_names, years, values = _metric_arrays(frames, metrics)
+    if len(values):
+        # Sort into one run of rows per (metric, company) series, in Year order.
+        series_keys = codes * len(companies) + companies.get_indexer(company_names)
+        order = np.lexsort((years, series_keys))
+        series_keys, years, values = series_keys[order], years[order], values[order]
+
+        starts = np.flatnonzero(np.r_[True, series_keys[1:] != series_keys[:-1]])
+        ends = np.r_[starts[1:], len(values)]
+        count = ends - starts
+        total = np.add.reduceat(values, starts)
+        mean = total / count
+        first = values[starts]
+        last = values[ends - 1]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            squares = np.add.reduceat((values - np.repeat(mean, count)) ** 2, starts)
+            std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+            # Year-on-year growth; the first row of each series has none.
+            growth = np.full(len(values), np.nan)
+            growth[1:] = values[1:] / values[:-1] - 1
+            growth[starts] = np.nan
+            has_growth = ~np.isnan(growth)
+            growth_count = np.add.reduceat(has_growth, starts)
+            growth_mean = np.add.reduceat(np.where(has_growth, growth, 0), starts) / growth_count
+            growth_squares = np.add.reduceat(np.where(has_growth, growth - np.repeat(growth_mean, count), 0) ** 2, starts)
+            growth_std = np.where(growth_count > 1, np.sqrt(growth_squares / (growth_count - 1)), np.nan)
+
+            # Mean year-on-year change of a series is (last - first) / (n - 1)
+            step = np.where(count > 1, (last - first) / (count - 1), np.nan)
+
+            span = years[ends - 1] - years[starts]
+            cagr = np.where((first > 0) & (last > 0) & (span > 0), (last / first) ** (1 / span) - 1, np.nan)
+
+        stats = {
+            "count": count,
+            "first": first,
+            "last": last,
+            "sum": total,
+            "mean": mean,
+            "max": np.maximum.reduceat(values, starts),
+            "std": std,
+            "step": step,
+            "growth_mean": growth_mean,
+            "growth_std": growth_std,
+            "cagr": cagr,
+        }
+        metric_codes, company_codes = np.divmod(series_keys[starts], len(companies))
+        for position, stat in enumerate(STATS):
+            table[company_codes, metric_codes, position] = stats[stat]
+
+    columns = pd.MultiIndex.from_product([metrics, STATS], names=["Metric", "Stat"])
+    return pd.DataFrame(table.reshape(len(companies), len(metrics) * len(STATS)), index=companies, columns=columns)
@@ -0,0 +1,145 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import scraper
+from cache import normalize_company_url
+from fetch import host_limiter
+from parallel import load_stacked_parallel
+from scoring import score_companies, stack_datasets
+from store import financial_store
+
+
+RESULT_COLUMNS = [
+    "URL",
+    "Company",
+    "Confidence Score",
+    "Growth",
+    "Profitability",
+    "Financial Position",
+    "Cash Flow",
+    "Governance",
+    "Cyclical",
+    "Strengths",
+    "Risks",
+    "Error",
+]
+
+
+# -----------------------------
+# Batch / Portfolio Mode
+# -----------------------------
+def read_url_list(lines):
+    # One URL per line; blank lines, "#" comments and repeats of the same company are skipped.
+    urls = {}
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.setdefault(normalize_company_url(line), line)
+    return list(urls.values())
+
+
+def load_windowed(url, analysis_window="Last Decade", loader=financial_store.load_company):
+    return scraper.window_dataset(scraper.index_years(loader(url)), analysis_window)
+
+
+def load_datasets(urls, load, workers=8):
+    # Fetching is I/O bound and runs on a thread pool. Returns the loaded
+    # datasets by URL, in input order, and one error row per failed URL.
+    datasets = {}
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(load, url): url for url in urls}
+
+        for future in as_completed(futures):
+            try:
+                datasets[futures[future]] = future.result()
+            except Exception as e:
+                errors.append({"URL": futures[future], "Error": f"{type(e).__name__}: {e}"})
+
+    return {url: datasets[url] for url in urls if url in datasets}, errors
+
+
+def analyze_urls(urls, workers=8, analysis_window="Last Decade", loader=financial_store.load_company):
+    datasets, errors = load_datasets(urls, lambda url: load_windowed(url, analysis_window, loader), workers)
+    return score_datasets(datasets, errors)
+
+
+def score_datasets(datasets, errors):
+    companies = {url: dataset["company_name"] for url, dataset in datasets.items()}
+    stacked = stack_datasets(list(datasets.values()), keys=list(datasets)) if datasets else {}
+    return score_stacked(companies, stacked, errors)
+
+
+def score_stacked(companies, stacked, errors):
+    # Scoring runs once, vectorized, over every company that loaded;
+    # companies maps each loaded URL to its company name and the stacked
+    # frames are keyed by URL (see scoring.stack_datasets).
+    frames = []
+    if companies:
+        companies = pd.DataFrame({
+            "URL": list(companies),
+            "Company": list(companies.values()),
+        })
+        scores = score_companies(stacked).rename(columns={"Company": "URL"})
+        scored = companies.merge(scores, on="URL", how="left").rename(columns={
+            "confidence_score": "Confidence Score",
+            "growth_score": "Growth",
+            "profitability_score": "Profitability",
+            "balance_score": "Financial Position",
+            "cashflow_score": "Cash Flow",
+            "governance_score": "Governance",
+            "is_cyclical": "Cyclical",
+            "strengths": "Strengths",
+            "risks": "Risks",
+        })
+        scored["Cyclical"] = scored["Cyclical"].astype(object)
+        scored["Strengths"] = scored["Strengths"].str.join(" | ")
+        scored["Risks"] = scored["Risks"].str.join(" | ")
+        frames.append(scored)
+
+    if errors:
+        frames.append(pd.DataFrame(errors))
+
+    results = pd.concat(frames, ignore_index=True).reindex(columns=RESULT_COLUMNS) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+    return results.sort_values("Confidence Score", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score many Screener companies in one run.")
+    parser.add_argument("url_file", help="text file with one Screener company URL per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="batch_results.csv", help="CSV file for the consolidated results")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="concurrent fetches")
+    parser.add_argument("--min-interval", type=float, default=host_limiter.min_interval, help="seconds between requests to the same host")
+    parser.add_argument("--window", default="Last Decade", choices=list(scraper.ANALYSIS_WINDOWS), help="analysis window used for scoring")
+    parser.add_argument("--no-store", action="store_true", help="always scrape instead of reading the on-disk store")
+    parser.add_argument("-p", "--processes", type=int, nargs="?", const=os.cpu_count(), help="parse pages on a pool of this many processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    if args.url_file == "-":
+        urls = read_url_list(sys.stdin)
+    else:
+        with open(args.url_file, encoding="utf-8") as f:
+            urls = read_url_list(f)
+
+    host_limiter.min_interval = args.min_interval
+    loader = scraper.load_company if args.no_store else financial_store.load_company
+
+    if args.processes:
+        store = None if args.no_store else financial_store
+        results = score_stacked(*load_stacked_parallel(urls, args.window, args.workers, args.processes, store))
+    else:
+        results = analyze_urls(urls, args.workers, args.window, loader)
+    results.to_csv(args.output, index=False)
+
+    failed = results["Error"].notna().sum()
+    print(f"Scored {len(results) - failed} of {len(results)} companies -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
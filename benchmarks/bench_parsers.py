@@ -0,0 +1,71 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import PageSnapshot, extract_company_records  # noqa: E402
+
+
+MODES = {
+    "bs4 html.parser (full page)": ("html.parser", False),
+    "bs4 html.parser (targeted)": ("html.parser", True),
+    "lxml (full page)": ("lxml", False),
+    "lxml (targeted)": ("lxml", True),
+}
+
+
+def page_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.html"))))
+        else:
+            files.append(path)
+    return files
+
+
+def same_records(a, b):
+    # Frames compare with equals, other values (name, industry) with ==.
+    return a.keys() == b.keys() and all(
+        a[key].equals(b[key]) if isinstance(a[key], pd.DataFrame) else a[key] == b[key] for key in a
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare HTML parser modes on saved Screener company pages.")
+    parser.add_argument("pages", nargs="+", help="saved .html pages or directories of them")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="passes over the page set per mode")
+    args = parser.parse_args(argv)
+
+    pages = [open(f, encoding="utf-8").read() for f in page_files(args.pages)]
+    if not pages:
+        parser.error("no .html pages found")
+
+    baseline = [extract_company_records(PageSnapshot("", html, "html.parser", False)) for html in pages]
+    baseline_time = None
+
+    print(f"{len(pages)} pages, {args.repeat} passes")
+    print(f"{'mode':<30} {'ms/page':>10} {'speedup':>8}  records")
+
+    for mode, (parser_name, targeted) in MODES.items():
+        try:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = [extract_company_records(PageSnapshot("", html, parser_name, targeted)) for html in pages]
+            elapsed = (time.perf_counter() - start) / (args.repeat * len(pages))
+        except Exception as e:
+            print(f"{mode:<30} skipped ({type(e).__name__}: {e})")
+            continue
+
+        baseline_time = baseline_time or elapsed
+        matches = all(same_records(r, b) for r, b in zip(results, baseline))
+        print(f"{mode:<30} {elapsed * 1000:>10.2f} {baseline_time / elapsed:>7.2f}x  {'match' if matches else 'DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
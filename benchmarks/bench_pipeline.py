@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import derive_metrics  # noqa: E402
+from bench_parsers import page_files  # noqa: E402
+from fixtures import fixture_pages  # noqa: E402
+from scoring import score_company  # noqa: E402
+from scraper import PageSnapshot, build_dataset, extract_company_records, index_years, window_dataset  # noqa: E402
+
+
+ANALYSIS_WINDOW = "Last Decade"
+
+# Stage name -> function from the previous stage's output to this stage's,
+# one company at a time. "scrape" runs the ratio, statement, shareholding
+# and quarterly scrapers; "pivot" builds the wide statements; "clean" is the
+# Year cleaning and windowing; "score" derives the metrics and scores.
+STAGES = {
+    "parse": lambda html: PageSnapshot("", html),
+    "scrape": extract_company_records,
+    "pivot": build_dataset,
+    "clean": lambda dataset: window_dataset(index_years(dataset), ANALYSIS_WINDOW),
+    "score": lambda windowed: score_company(windowed, derive_metrics(windowed)),
+}
+
+DATASET_FRAMES = ["ratios_df", "pnl_q_df", "pnl_y_df", "balance_df", "cashflow_df", "shareholding_df"]
+
+
+# -----------------------------
+# Stage Runs
+# -----------------------------
+def time_stages(pages, repeat):
+    # Best-of-repeat wall time of each stage over the whole corpus, and the
+    # outputs of the last pass.
+    seconds = {stage: float("inf") for stage in STAGES}
+    for _ in range(repeat):
+        outputs = pages
+        for stage, run in STAGES.items():
+            start = time.perf_counter()
+            outputs = [run(item) for item in outputs]
+            seconds[stage] = min(seconds[stage], time.perf_counter() - start)
+            if stage == "pivot":
+                datasets = outputs
+    return seconds, datasets, outputs
+
+
+def trace_stages(pages):
+    # One separate pass under tracemalloc, which slows everything down: the
+    # bytes allocated by each stage and its peak above the starting point.
+    allocations = {}
+    outputs = pages
+    tracemalloc.start()
+    try:
+        for stage, run in STAGES.items():
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            outputs = [run(item) for item in outputs]
+            current, peak = tracemalloc.get_traced_memory()
+            allocations[stage] = {"retained_kb": (current - before) / 1024, "peak_kb": (peak - before) / 1024}
+    finally:
+        tracemalloc.stop()
+    return allocations
+
+
+def dataset_checksum(dataset):
+    # Changes whenever a scraped value, label or row order changes.
+    digest = hashlib.sha1(dataset["company_name"].encode("utf-8"))
+    for key in DATASET_FRAMES:
+        df = dataset[key]
+        digest.update(repr(list(df.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def run_benchmark(pages, repeat=5):
+    seconds, datasets, scores = time_stages(pages, repeat)
+    allocations = trace_stages(pages)
+
+    stages = {
+        stage: {
+            "seconds": seconds[stage],
+            "ms_per_company": seconds[stage] * 1000 / len(pages),
+            "companies_per_sec": len(pages) / seconds[stage],
+            **allocations[stage],
+        }
+        for stage in STAGES
+    }
+    total = sum(seconds.values())
+    stages["total"] = {
+        "seconds": total,
+        "ms_per_company": total * 1000 / len(pages),
+        "companies_per_sec": len(pages) / total,
+        "retained_kb": sum(a["retained_kb"] for a in allocations.values()),
+        "peak_kb": max(a["peak_kb"] for a in allocations.values()),
+    }
+
+    results = {
+        dataset["company_name"]: {
+            "checksum": dataset_checksum(dataset),
+            "confidence_score": score["confidence_score"],
+            "strengths": score["strengths"],
+            "risks": score["risks"],
+        }
+        for dataset, score in zip(datasets, scores)
+    }
+    return {"companies": len(pages), "repeat": repeat, "stages": stages, "results": results}
+
+
+# -----------------------------
+# Baseline Comparison
+# -----------------------------
+def compare(report, baseline, tolerance):
+    # Stages more than tolerance slower, or with a peak more than tolerance
+    # larger, than the baseline; and companies whose data or score changed.
+    # Peaks grow with the corpus, so they are only compared on equal corpora.
+    keys = ["ms_per_company", "peak_kb"] if report["companies"] == baseline["companies"] else ["ms_per_company"]
+    regressions = []
+    for stage, current in report["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None:
+            continue
+        for key in keys:
+            if before[key] > 0 and current[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{stage}: {key} {before[key]:.2f} -> {current[key]:.2f} (+{current[key] / before[key] - 1:.0%})")
+
+    for company, result in report["results"].items():
+        before = baseline["results"].get(company)
+        if before is None:
+            continue
+        for key, value in result.items():
+            if before[key] != value:
+                regressions.append(f"{company}: {key} changed")
+
+    return regressions
+
+
+def print_report(report, baseline=None):
+    print(f"{report['companies']} companies, best of {report['repeat']} passes")
+    print(f"{'stage':<8} {'ms/company':>11} {'companies/s':>12} {'peak KB':>10} {'retained KB':>12} {'vs baseline':>12}")
+    for stage, row in report["stages"].items():
+        change = ""
+        if baseline and stage in baseline["stages"]:
+            change = f"{row['ms_per_company'] / baseline['stages'][stage]['ms_per_company'] - 1:+.0%}"
+        print(
+            f"{stage:<8} {row['ms_per_company']:>11.3f} {row['companies_per_sec']:>12.1f} "
+            f"{row['peak_kb']:>10.0f} {row['retained_kb']:>12.0f} {change:>12}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each stage of the scrape-to-score pipeline on saved Screener pages, offline.")
+    parser.add_argument("pages", nargs="*", help="saved .html pages or directories of them (default: synthetic pages)")
+    parser.add_argument("-n", "--companies", type=int, default=50, help="number of synthetic pages when no pages are given")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timed passes over the corpus; the best one is reported")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write this run as the baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown or peak growth, as a fraction of the baseline")
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        pages = []
+        for path in page_files(args.pages):
+            with open(path, encoding="utf-8") as f:
+                pages.append(f.read())
+        if not pages:
+            parser.error("no .html pages found")
+    else:
+        pages = fixture_pages(args.companies)
+
+    report = run_benchmark(pages, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline is None:
+        return 0
+
+    regressions = compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
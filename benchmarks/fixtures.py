@@ -0,0 +1,136 @@
+import argparse
+import os
+import random
+
+
+# -----------------------------
+# Synthetic Screener Pages
+# -----------------------------
+# Pages with the same markup as a Screener company page (the parts the
+# scrapers read), filled with seeded random numbers, so that benchmarks run
+# without the network and without checking in pages from screener.in.
+def data_table(periods, rows):
+    head = "".join(f"<th>{period}</th>" for period in [""] + periods)
+    body = "".join(
+        f"<tr><td class='text'>{metric}</td>{''.join(f'<td>{value}</td>' for value in values)}</tr>"
+        for metric, values in rows
+    )
+    return f"<table class='data-table'><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def amount(value):
+    return f"{value:,.0f}"
+
+
+def fixture_page(name, seed=0, years=12, quarters=13):
+    rnd = random.Random(seed)
+    base = rnd.uniform(1000, 50000)
+
+    def series(n, growth=0.1, noise=0.05):
+        value = base
+        values = []
+        for _ in range(n):
+            value *= 1 + growth + rnd.uniform(-noise, noise)
+            values.append(value)
+        return values
+
+    year_labels = [f"Mar {2013 + i}" for i in range(years)]
+    quarter_labels = [f"{month} {year}" for year in range(2013 + years - 4, 2013 + years + 1) for month in ("Mar", "Jun", "Sep", "Dec")][:quarters]
+    shareholding_labels = year_labels[-9:]
+
+    sales = series(years + 1)
+    profit_loss = [
+        ("Sales +", [amount(v) for v in sales]),
+        ("Expenses +", [amount(v * 0.75) for v in sales]),
+        ("Operating Profit", [amount(v * 0.25) for v in sales]),
+        ("OPM %", [f"{25 + rnd.uniform(-3, 3):.0f}%" for _ in sales]),
+        ("Net Profit +", [amount(v * 0.18) for v in sales]),
+        ("EPS in Rs", [f"{v / 1000:.2f}" for v in sales]),
+        ("Dividend Payout %", ["-"] + ["40%"] * years),
+    ]
+
+    quarterly_sales = series(len(quarter_labels), 0.02)
+    quarterly = [
+        ("Sales +", [amount(v) for v in quarterly_sales]),
+        ("Expenses +", [amount(v * 0.75) for v in quarterly_sales]),
+        ("Operating Profit", [amount(v * 0.25) for v in quarterly_sales]),
+        ("OPM %", ["25%"] * len(quarterly_sales)),
+        ("Net Profit +", [amount(v * 0.18) for v in quarterly_sales]),
+    ]
+
+    # The latest balance sheet is a half-year one, as on Screener.
+    balance_labels = year_labels + [f"Sep {2013 + years - 1}"]
+    balance_sheet = [
+        ("Equity Capital", [amount(100)] * len(balance_labels)),
+        ("Reserves", [amount(v) for v in series(len(balance_labels))]),
+        ("Borrowings +", [amount(v * 0.1) for v in series(len(balance_labels), 0.02)]),
+        ("Other Liabilities +", [amount(v) for v in series(len(balance_labels))]),
+        ("Total Liabilities", [amount(v * 3) for v in series(len(balance_labels))]),
+        ("Total Assets", [amount(v * 3) for v in series(len(balance_labels))]),
+    ]
+
+    cash_flow = [
+        ("Cash from Operating Activity +", [amount(v * 0.2) for v in series(years)]),
+        ("Cash from Investing Activity +", [amount(-v * 0.08) for v in series(years)]),
+        ("Cash from Financing Activity +", [amount(-v * 0.1) for v in series(years)]),
+        ("Net Cash Flow", [amount(v * 0.02) for v in series(years)]),
+    ]
+
+    shareholding = [
+        ("Promoters +", [f"{72 - 0.1 * i:.2f}%" for i in range(len(shareholding_labels))]),
+        ("FIIs +", [f"{12 + 0.2 * i:.2f}%" for i in range(len(shareholding_labels))]),
+        ("DIIs +", [f"{8 + 0.1 * i:.2f}%" for i in range(len(shareholding_labels))]),
+        ("Public +", [f"{8 - 0.2 * i:.2f}%" for i in range(len(shareholding_labels))]),
+        ("No. of Shareholders", [amount(100000 + i * 1000) for i in range(len(shareholding_labels))]),
+    ]
+
+    ratios = [
+        ("Market Cap", f"₹ {amount(base * 50)} Cr."),
+        ("Current Price", f"₹ {amount(base / 10)}"),
+        ("High / Low", f"₹ {amount(base / 8)} / {amount(base / 12)}"),
+        ("Stock P/E", f"{rnd.uniform(10, 60):.1f}"),
+        ("Book Value", f"₹ {base / 50:.1f}"),
+        ("Dividend Yield", f"{rnd.uniform(0, 3):.2f} %"),
+        ("ROCE", f"{rnd.uniform(5, 40):.1f} %"),
+        ("ROE", f"{rnd.uniform(5, 35):.1f} %"),
+        ("Face Value", "₹ 1.00"),
+    ]
+    top_ratios = "".join(f"<li><span class='name'>{n}</span><span class='nowrap value'>{v}</span></li>" for n, v in ratios)
+
+    return f"""<html><head><title>{name}</title></head><body>
+<div class="flex flex-space-between container hide-from-tablet-landscape"><h1 class="h2 shrink-text">{name}</h1></div>
+<div class="company-ratios"><ul id="top-ratios">{top_ratios}</ul></div>
+<section id="peers"><p class="sub">
+<a href="/market/IN01/" title="Broad Sector">Information Technology</a>
+<a href="/market/IN01/IN0101/" title="Sector">Information Technology</a>
+<a href="/market/IN01/IN0101/IN010101/" title="Broad Industry">IT - Services</a>
+<a href="/market/IN01/IN0101/IN010101/IN010101001/" title="Industry">Computers - Software &amp; Consulting</a>
+</p><div id="peers-table-placeholder"></div></section>
+<section id="quarters">{data_table(quarter_labels, quarterly)}</section>
+<section id="profit-loss">{data_table(year_labels + ["TTM"], profit_loss)}</section>
+<section id="balance-sheet">{data_table(balance_labels, balance_sheet)}</section>
+<section id="cash-flow">{data_table(year_labels, cash_flow)}</section>
+<section id="shareholding"><div id="quarterly-shp"></div><div id="yearly-shp">{data_table(shareholding_labels, shareholding)}</div></section>
+</body></html>"""
+
+
+def fixture_pages(count, seed=0):
+    # count synthetic pages; the same seed always gives the same corpus.
+    return [fixture_page(f"Fixture Company {i + 1:03d} Ltd", seed + i) for i in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Screener company pages for the benchmarks.")
+    parser.add_argument("directory", help="directory to write the .html pages to")
+    parser.add_argument("-n", "--count", type=int, default=50, help="number of pages")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first page")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.directory, exist_ok=True)
+    for i, html in enumerate(fixture_pages(args.count, args.seed)):
+        with open(os.path.join(args.directory, f"company_{i + 1:03d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+
+if __name__ == "__main__":
+    main()
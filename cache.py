@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from compact import CompactDataset
+
+
+# Enough for the NIFTY 500 with both standalone and consolidated pages, at
+# roughly 9 KB per compact company.
+CACHE_MAX_ENTRIES = int(os.environ.get("DATASET_CACHE_MAX_ENTRIES", "1024"))
+
+
+# -----------------------------
+# Cache Key
+# -----------------------------
+def normalize_company_url(url):
+    # "https://www.screener.in/company/tcs/consolidated/?x=1" -> "TCS/consolidated"
+    path = urlparse(url.strip()).path
+    parts = [p for p in path.split("/") if p]
+
+    if "company" in parts:
+        parts = parts[parts.index("company") + 1:]
+
+    if not parts:
+        return url.strip().lower()
+
+    slug = parts[0].upper()
+    if len(parts) > 1 and parts[1].lower() == "consolidated":
+        return f"{slug}/consolidated"
+    return slug
+
+
+# -----------------------------
+# Shared Dataset Cache
+# -----------------------------
+class DatasetCache:
+    # Process-wide cache of loaded company datasets with TTL expiry and
+    # least-recently-used eviction once max_entries is reached. Entries are
+    # held as CompactDataset arrays and every get builds fresh frames, so
+    # callers never share (or mutate) each other's DataFrames.
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=6 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        key = normalize_company_url(url)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, compact = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return compact.to_dataset()
+
+    def put(self, url, dataset):
+        key = normalize_company_url(url)
+        compact = CompactDataset.from_dataset(dataset)
+
+        with self._lock:
+            self._entries[key] = (time.time(), compact)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, url, loader):
+        dataset = self.get(url)
+        if dataset is None:
+            dataset = loader(url)
+            self.put(url, dataset)
+        return dataset
+
+    def invalidate(self, url):
+        with self._lock:
+            return self._entries.pop(normalize_company_url(url), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self):
+        # Normalized URLs of the cached companies, most recently used last.
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(compact.nbytes for _, compact in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+dataset_cache = DatasetCache()
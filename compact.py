@@ -0,0 +1,128 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Interned Labels
+# -----------------------------
+# Most companies share the same metric and period labels; each distinct
+# label tuple is kept once and shared by every company that has it.
+_labels = {}
+_labels_lock = threading.Lock()
+
+
+def intern_labels(labels):
+    labels = tuple(sys.intern(str(label)) for label in labels)
+    with _labels_lock:
+        return _labels.setdefault(labels, labels)
+
+
+# -----------------------------
+# Compact Containers
+# -----------------------------
+class Statement:
+    # One wide statement as a float64 period × metric matrix. Yearly
+    # periods are int16 years, quarters interned labels. No per-row
+    # Company strings are kept: the company is one name per dataset.
+    __slots__ = ("period_col", "periods", "metrics", "values", "year_indexed")
+
+    def __init__(self, period_col, periods, metrics, values, year_indexed):
+        self.period_col = period_col
+        self.periods = periods
+        self.metrics = metrics
+        self.values = values
+        self.year_indexed = year_indexed
+
+    @classmethod
+    def from_frame(cls, df):
+        # df is Company, period, then one float column per metric (see
+        # scraper.build_statement); returns None for an empty frame.
+        if len(df.columns) < 2:
+            return None
+
+        period_col = df.columns[1]
+        periods = df[period_col].to_numpy()
+        periods = periods.astype(np.int16) if period_col == "Year" else intern_labels(periods)
+
+        return cls(
+            period_col,
+            periods,
+            intern_labels(df.columns[2:]),
+            np.ascontiguousarray(df.iloc[:, 2:].to_numpy(dtype=np.float64)),
+            not isinstance(df.index, pd.RangeIndex),
+        )
+
+    def to_frame(self, company):
+        df = pd.DataFrame(self.values, columns=pd.Index(list(self.metrics), dtype=object, name="Metric"), copy=True)
+        periods = self.periods.astype(np.int64) if self.period_col == "Year" else list(self.periods)
+        df.insert(0, self.period_col, periods)
+        df.insert(0, "Company", company)
+        if self.year_indexed:
+            df.index = pd.Index(periods)
+        return df
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (self.periods.nbytes if self.period_col == "Year" else 0)
+
+
+class Ratios:
+    # The top ratios as interned names and one float64 array.
+    __slots__ = ("names", "values")
+
+    def __init__(self, names, values):
+        self.names = names
+        self.values = values
+
+    @classmethod
+    def from_frame(cls, ratios_df):
+        return cls(intern_labels(ratios_df["Metric"]), ratios_df["Value"].to_numpy(dtype=np.float64, copy=True))
+
+    def to_frame(self, company):
+        return pd.DataFrame({"Company": company, "Metric": list(self.names), "Value": self.values.copy()})
+
+
+class CompactDataset:
+    # A company dataset (see scraper.build_dataset, index_years) held as
+    # Ratios and Statements instead of DataFrames, for caches that keep
+    # many companies. to_dataset() rebuilds the frames when they are used.
+    __slots__ = ("company_name", "ratios", "statements", "extras")
+
+    def __init__(self, company_name, ratios, statements, extras):
+        self.company_name = company_name
+        self.ratios = ratios
+        self.statements = statements
+        self.extras = extras
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        statements = {}
+        extras = {}
+        for key, value in dataset.items():
+            if key in ("company_name", "ratios_df"):
+                continue
+            if isinstance(value, pd.DataFrame):
+                statements[key] = Statement.from_frame(value)
+            else:
+                extras[key] = value
+
+        return cls(sys.intern(dataset["company_name"]), Ratios.from_frame(dataset["ratios_df"]), statements, extras)
+
+    def to_dataset(self):
+        return {
+            "company_name": self.company_name,
+            "ratios_df": self.ratios.to_frame(self.company_name),
+            **{
+                key: pd.DataFrame() if statement is None else statement.to_frame(self.company_name)
+                for key, statement in self.statements.items()
+            },
+            **self.extras,
+        }
+
+    @property
+    def nbytes(self):
+        # Array payload only; the labels are shared.
+        return self.ratios.values.nbytes + sum(s.nbytes for s in self.statements.values() if s is not None)
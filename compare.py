@@ -0,0 +1,73 @@
+import pandas as pd
+
+from analytics import metric_values
+from batch import load_datasets, read_url_list
+from cache import dataset_cache, normalize_company_url
+from scoring import stack_datasets
+from scraper import SCREENER_URL, window_dataset
+from store import load_cached_company
+
+
+# Chart label -> analytics metric.
+COMPARE_METRICS = {
+    "Sales": "Sales",
+    "Net Profit": "Net Profit",
+    "OPM %": "OPM",
+    "Borrowings": "Borrowings",
+    "Cash from Operating Activity": "Operating Cash Flow",
+    "Promoters": "Promoters",
+}
+
+
+# -----------------------------
+# Company Selection
+# -----------------------------
+def cached_company_urls(cache=dataset_cache):
+    # Screener URLs of the companies already in the dataset cache.
+    return [f"{SCREENER_URL}company/{key}/" for key in cache.keys()]
+
+
+def company_labels(datasets):
+    # One chart label per URL: the company name, with the Screener slug
+    # added where names repeat (standalone and consolidated pages).
+    names = pd.Series({url: dataset["company_name"] for url, dataset in datasets.items()}, dtype=object)
+    repeated = names.duplicated(keep=False)
+    return {
+        url: f"{name} ({normalize_company_url(url)})" if repeated[url] else name
+        for url, name in names.items()
+    }
+
+
+# -----------------------------
+# Aligned Time Series
+# -----------------------------
+def aligned_series(windowed_datasets, labels, metrics=COMPARE_METRICS):
+    # Long Metric / Company / Year / Value frame of every company on one
+    # shared Year axis, with Company holding each dataset's unique label:
+    # the datasets are stacked once, every metric is read in one
+    # metric_values pass and a single reindex over Metric × Company × Year
+    # turns years a company did not report into NaN gaps.
+    stacked = stack_datasets(windowed_datasets, keys=labels)
+    values = metric_values(stacked, list(metrics.values()))
+    values["Metric"] = values["Metric"].map({metric: label for label, metric in metrics.items()})
+
+    companies = list(labels)
+    years = pd.unique(pd.concat([stacked[key]["Year"] for key in ["pnl_y_df", "balance_df", "cashflow_df", "shareholding_df"]]))
+    index = pd.MultiIndex.from_product([list(metrics), companies, sorted(years)], names=["Metric", "Company", "Year"])
+
+    return values.set_index(["Metric", "Company", "Year"])["Value"].reindex(index).reset_index()
+
+
+def compare_companies(urls, analysis_window="Last Decade", workers=8, load=load_cached_company):
+    # Loads the companies concurrently (cached datasets are reused) and
+    # aligns their windowed series, each URL once. Returns values and
+    # per-company errors.
+    urls = read_url_list(urls)
+    datasets, errors = load_datasets(urls, load, workers)
+    windowed = [window_dataset(d, analysis_window) for d in datasets.values()]
+    labels = company_labels(datasets)
+
+    return {
+        "values": aligned_series(windowed, list(labels.values())) if windowed else pd.DataFrame(columns=["Metric", "Company", "Year", "Value"]),
+        "errors": pd.DataFrame(errors, columns=["URL", "Error"]),
+    }
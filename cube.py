@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from analytics import metric_values
+from batch import load_datasets
+from cache import normalize_company_url
+from scoring import stack_datasets
+from scraper import build_dataset, index_years
+from store import financial_store
+
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIR = "_universe"
+INDEX_FILE = "index.json"
+
+
+# -----------------------------
+# Company × Metric × Year Cube
+# -----------------------------
+class FinancialCube:
+    # Every stored company's metrics as one float64 company × metric × year
+    # array (NaN where a company did not report), plus a company × ratio
+    # matrix of the latest top ratios. Companies are store slugs
+    # ("TCS/consolidated"), as names repeat across standalone and
+    # consolidated pages; names holds the display name of each, skipped the
+    # stored companies that failed to load ({"URL", "Error"} rows). Opened
+    # from disk the arrays are read-only memory maps, so every process on
+    # the machine shares one copy in the OS page cache.
+    def __init__(self, companies, names, metrics, first_year, values, ratio_names, ratios, built_at, skipped=()):
+        self.companies = pd.Index(companies, name="Company")
+        self.names = pd.Series(list(names), index=self.companies, dtype=object, name="Name")
+        self.metrics = list(metrics)
+        self.first_year = first_year
+        self.values = values
+        self.ratio_names = list(ratio_names)
+        self.ratios = ratios
+        self.built_at = built_at
+        self.skipped = list(skipped)
+        self._metric_codes = {metric: code for code, metric in enumerate(self.metrics)}
+
+    @property
+    def years(self):
+        return np.arange(self.first_year, self.first_year + self.values.shape[2])
+
+    def metric(self, metric):
+        # company × year view of one metric, or None if no company has it.
+        code = self._metric_codes.get(metric)
+        return None if code is None else self.values[:, code, :]
+
+    def ratio_frame(self):
+        return pd.DataFrame(self.ratios, index=self.companies, columns=self.ratio_names)
+
+
+def _stored_dataset(store, url):
+    # The stored copy as it is, even if stale: the cube never scrapes.
+    return index_years(build_dataset(store.read(url)))
+
+
+def build_cube(store=financial_store, workers=8):
+    # Reads every stored company once and scatters its long Metric /
+    # Company / Year / Value rows (see analytics.metric_values) into the cube.
+    datasets, errors = load_datasets(list(store.companies()), lambda url: _stored_dataset(store, url), workers)
+    for error in errors:
+        logger.warning("Left %s out of the cube: %s", error["URL"], error["Error"])
+    if not datasets:
+        return FinancialCube([], [], [], 0, np.full((0, 0, 0), np.nan), [], np.full((0, 0), np.nan), time.time(), errors)
+
+    companies = pd.Index([normalize_company_url(url) for url in datasets])
+    stacked = stack_datasets(list(datasets.values()), keys=companies)
+    values = metric_values(stacked)
+    ratios = stacked["ratios_df"].drop_duplicates(["Company", "Metric"]).pivot(index="Company", columns="Metric", values="Value")
+
+    metric_codes, metrics = pd.factorize(values["Metric"])
+    years = values["Year"].to_numpy(dtype=np.int64)
+    first_year = int(years.min()) if len(years) else 0
+    year_count = int(years.max()) - first_year + 1 if len(years) else 0
+
+    cube = np.full((len(companies), len(metrics), year_count), np.nan)
+    cube[companies.get_indexer(values["Company"]), metric_codes, years - first_year] = values["Value"].to_numpy(dtype=np.float64)
+
+    names = [dataset["company_name"] for dataset in datasets.values()]
+    ratios = ratios.reindex(companies)
+    return FinancialCube(companies, names, metrics, first_year, cube, ratios.columns, ratios.to_numpy(dtype=np.float64), time.time(), errors)
+
+
+# -----------------------------
+# Memory-mapped Files
+# -----------------------------
+def cube_dir(store=financial_store):
+    return os.path.join(store.root, CUBE_DIR)
+
+
+def save_cube(cube, directory):
+    # <directory>/values-<stamp>.npy and ratios-<stamp>.npy hold the arrays,
+    # index.json the labels and file names. Every build writes files of its
+    # own and the index is replaced last and atomically, so readers always
+    # see a complete cube and processes rebuilding at the same time do not
+    # overwrite each other. Processes still mapping older files keep
+    # reading them until they reopen.
+    os.makedirs(directory, exist_ok=True)
+    previous = read_cube_index(directory)
+    stamp = f"{int(cube.built_at * 1e6)}-{uuid.uuid4().hex[:8]}"
+
+    files = {"values": f"values-{stamp}.npy", "ratios": f"ratios-{stamp}.npy"}
+    np.save(os.path.join(directory, files["values"]), cube.values)
+    np.save(os.path.join(directory, files["ratios"]), cube.ratios)
+
+    index = {
+        "files": files,
+        "companies": list(cube.companies),
+        "names": list(cube.names),
+        "metrics": cube.metrics,
+        "first_year": cube.first_year,
+        "ratios": cube.ratio_names,
+        "built_at": cube.built_at,
+        "skipped": cube.skipped,
+    }
+    tmp_path = os.path.join(directory, f"{INDEX_FILE}.{stamp}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(directory, INDEX_FILE))
+
+    if previous is not None:
+        _remove_old_files(directory, previous)
+
+
+def _remove_old_files(directory, previous):
+    # The previously published arrays, and any other left from builds that
+    # finished before it. Files of a build still in progress elsewhere are
+    # newer than the previous index and stay.
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.endswith((".npy", ".tmp")):
+            continue
+        try:
+            if name in previous["files"].values() or os.path.getmtime(path) < previous["built_at"]:
+                os.remove(path)
+        except OSError:
+            # Already removed by another process, or still mapped (Windows).
+            pass
+
+
+def read_cube_index(directory):
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_cube(directory, index=None):
+    # The saved cube, memory-mapped read-only; None if there is none.
+    index = index or read_cube_index(directory)
+    if index is None:
+        return None
+
+    return FinancialCube(
+        index["companies"],
+        index["names"],
+        index["metrics"],
+        index["first_year"],
+        np.load(os.path.join(directory, index["files"]["values"]), mmap_mode="r"),
+        index["ratios"],
+        np.load(os.path.join(directory, index["files"]["ratios"]), mmap_mode="r"),
+        index["built_at"],
+        index.get("skipped", []),
+    )
@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+import scraper
+from analytics import STATS, derive_metrics
+from batch import load_windowed
+from fetch import host_limiter
+from scoring import score_company
+from store import financial_store
+
+
+# -----------------------------
+# Headless Diagnosis
+# -----------------------------
+def diagnose(url, analysis_window="Last Decade", loader=financial_store.load_company):
+    # The Executive Page score and the derived metrics of one company,
+    # without Streamlit.
+    windowed = load_windowed(url, analysis_window, loader)
+    derived = derive_metrics(windowed)
+    industry = windowed.get("industry") or {}
+
+    return {
+        "url": url,
+        "company": windowed["company_name"],
+        "industry": industry.get("name"),
+        "analysis_window": analysis_window,
+        **score_company(windowed, derived),
+        "metrics": json.loads(derived.iloc[0].unstack("Stat").loc[derived.columns.unique("Metric"), STATS].to_json(orient="index")),
+    }
+
+
+def diagnosis_frame(diagnosis):
+    # One row per company, with the metrics flattened to "<metric> <stat>" columns.
+    row = {key: value for key, value in diagnosis.items() if key != "metrics"}
+    for metric, stats in diagnosis["metrics"].items():
+        for stat, value in stats.items():
+            row[f"{metric} {stat}"] = value
+    return pd.DataFrame([row])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score one Screener company without the Streamlit UI.")
+    parser.add_argument("url", help="Screener company URL")
+    parser.add_argument("-f", "--format", default="json", choices=["json", "parquet"], help="output format")
+    parser.add_argument("-o", "--output", help="output file (JSON defaults to stdout)")
+    parser.add_argument("--window", default="Last Decade", choices=list(scraper.ANALYSIS_WINDOWS), help="analysis window used for scoring")
+    parser.add_argument("--min-interval", type=float, default=host_limiter.min_interval, help="seconds between requests to the same host")
+    parser.add_argument("--no-store", action="store_true", help="always scrape instead of reading the on-disk store")
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--format parquet needs --output")
+
+    host_limiter.min_interval = args.min_interval
+    loader = scraper.load_company if args.no_store else financial_store.load_company
+
+    try:
+        diagnosis = diagnose(args.url, args.window, loader)
+    except Exception as e:
+        print(f"Could not diagnose {args.url}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+
+    if args.format == "parquet":
+        diagnosis_frame(diagnosis).to_parquet(args.output, index=False)
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(diagnosis, f, indent=2)
+    else:
+        json.dump(diagnosis, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
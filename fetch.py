@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from timing import stage_timer
+
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; CompanyFinancialDiagnostics/1.0)"
+
+
+# -----------------------------
+# Per-host Rate Limiting
+# -----------------------------
+class HostRateLimiter:
+    # Spaces out requests to the same host by at least min_interval seconds,
+    # across all threads of the process.
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+host_limiter = HostRateLimiter(float(os.environ.get("SCREENER_MIN_INTERVAL", "1.0")))
+
+
+# -----------------------------
+# Pooled HTTP Fetcher
+# -----------------------------
+class Fetcher:
+    # One keep-alive requests.Session shared by every scraper, with bounded
+    # timeouts, exponential backoff on 429/5xx and ETag / Last-Modified
+    # revalidation of pages it has already downloaded. The bodies kept to
+    # answer a 304 are zlib-compressed UTF-8, at most max_validator_bytes
+    # of them, so a full index batch does not hold hundreds of MB of text.
+    def __init__(self, timeout=(5, 20), retries=3, backoff=0.5, pool_size=16, max_validators=512,
+                 max_validator_bytes=32 * 1024 * 1024, limiter=host_limiter):
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_validators = max_validators
+        self.max_validator_bytes = max_validator_bytes
+        self.timings = deque(maxlen=200)
+        self.requests = 0
+        self.not_modified = 0
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._validators = OrderedDict()
+        self._validator_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_text(self, url):
+        with self._lock:
+            cached = self._validators.get(url)
+
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        if self.limiter is not None:
+            self.limiter.wait(url)
+
+        start = time.perf_counter()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        elapsed = time.perf_counter() - start
+
+        if response.status_code == 304 and cached is not None:
+            text = zlib.decompress(cached["body"]).decode("utf-8")
+        else:
+            response.raise_for_status()
+            text = response.text
+            self._remember(url, response, text)
+
+        timing = {
+            "url": url,
+            "status": response.status_code,
+            "seconds": elapsed,
+            "bytes": len(response.content),
+            "not_modified": response.status_code == 304,
+        }
+        self.timings.append(timing)
+        stage_timer.add({"stage": "fetch", "seconds": elapsed, "bytes": timing["bytes"], "status": response.status_code})
+        with self._lock:
+            self.requests += 1
+            self.not_modified += timing["not_modified"]
+        logger.info("GET %s -> %s in %.3fs (%d bytes)", url, response.status_code, elapsed, timing["bytes"])
+
+        return text
+
+    def stats(self):
+        # Revalidated pages (304 Not Modified) count as cache hits.
+        with self._lock:
+            return {
+                "validators": len(self._validators),
+                "bytes": self._validator_bytes,
+                "hits": self.not_modified,
+                "misses": self.requests - self.not_modified,
+            }
+
+    def _remember(self, url, response, text):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        body = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            previous = self._validators.pop(url, None)
+            if previous is not None:
+                self._validator_bytes -= len(previous["body"])
+            self._validators[url] = {"etag": etag, "last_modified": last_modified, "body": body}
+            self._validator_bytes += len(body)
+            while len(self._validators) > self.max_validators or self._validator_bytes > self.max_validator_bytes:
+                _, evicted = self._validators.popitem(last=False)
+                self._validator_bytes -= len(evicted["body"])
+
+
+fetcher = Fetcher()
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pyarrow as pa
+
+from fetch import fetcher
+from scoring import FRAME_KEYS, keyed_dataset
+from scraper import PageSnapshot, build_dataset, extract_company_records, index_years, window_dataset
+from store import FinancialStore
+
+
+# -----------------------------
+# Arrow Packing
+# -----------------------------
+# Parsed frames travel from the worker processes to the parent as Arrow IPC
+# buffers, plain column buffers rather than pickled DataFrames, and the
+# parent turns each frame of every company into pandas in one go.
+def pack_frame(df):
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def unpack_frames(buffers):
+    # Many companies' packed frames as one stacked DataFrame; columns one
+    # company lacks are null for it, as with pd.concat.
+    tables = [pa.ipc.open_stream(buffer).read_all() for buffer in buffers]
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+# -----------------------------
+# Worker Processes
+# -----------------------------
+_stores = {}
+
+
+def parse_company(url, html, analysis_window="Last Decade", store_root=None):
+    # Runs in a worker process: parses, cleans and windows one page (or,
+    # with html=None, the stored copy) into packed frames for scoring. With
+    # store_root the fresh records are appended to that store first, so the
+    # dataset carries the full stored history as in the App.
+    if store_root is None:
+        records = extract_company_records(PageSnapshot(url, html))
+    else:
+        store = _stores.get(store_root)
+        if store is None:
+            store = _stores[store_root] = FinancialStore(store_root)
+        if html is not None:
+            store.write(url, extract_company_records(PageSnapshot(url, html)))
+        records = store.read(url)
+
+    windowed = keyed_dataset(window_dataset(index_years(build_dataset(records)), analysis_window), url)
+    return windowed["company_name"], {key: pack_frame(windowed[key]) for key in FRAME_KEYS}
+
+
+def load_stacked_parallel(urls, analysis_window="Last Decade", fetch_workers=8, processes=None, store=None):
+    # I/O and CPU run apart: pages are downloaded on a thread pool and each
+    # one is handed to a process pool as soon as it arrives, so parsing
+    # scales with cores instead of sharing one GIL. Companies fresh in the
+    # store skip the download. Returns the company name by URL (input
+    # order), the stacked windowed frames keyed by URL (see
+    # scoring.stack_datasets) and one error row per failed URL.
+    companies = {}
+    packed = {}
+    errors = []
+    store_root = None if store is None else store.root
+
+    # Spawned workers do not inherit the fetch threads' locks.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), mp_context=context) as pool, \
+            ThreadPoolExecutor(max_workers=fetch_workers) as io_pool:
+        parsing = {}
+        fetching = {}
+        for url in urls:
+            if store is not None and store.is_fresh(url):
+                parsing[pool.submit(parse_company, url, None, analysis_window, store_root)] = url
+            else:
+                fetching[io_pool.submit(fetcher.get_text, url)] = url
+
+        for future in as_completed(fetching):
+            url = fetching[future]
+            try:
+                parsing[pool.submit(parse_company, url, future.result(), analysis_window, store_root)] = url
+            except Exception as e:
+                errors.append({"URL": url, "Error": f"{type(e).__name__}: {e}"})
+
+        for future in as_completed(parsing):
+            url = parsing[future]
+            try:
+                companies[url], packed[url] = future.result()
+            except Exception as e:
+                errors.append({"URL": url, "Error": f"{type(e).__name__}: {e}"})
+
+    loaded = [url for url in urls if url in companies]
+    stacked = {key: unpack_frames([packed[url][key] for url in loaded]) for key in FRAME_KEYS} if loaded else {}
+    return {url: companies[url] for url in loaded}, stacked, errors
@@ -0,0 +1,89 @@
+import pandas as pd
+
+from analytics import derive_metrics
+from batch import load_datasets
+from cache import normalize_company_url
+from compare import company_labels
+from scoring import stack_datasets
+from scraper import scrape_industry_companies, window_dataset
+from store import load_cached_company
+
+
+# Compared metric -> True when a higher value ranks better.
+PEER_METRICS = {
+    "ROE": True,
+    "ROCE": True,
+    "OPM": True,
+    "Sales CAGR": True,
+    "Profit CAGR": True,
+    "Debt to Equity": False,
+}
+
+
+# -----------------------------
+# Peer Resolution
+# -----------------------------
+def resolve_peers(url, dataset, limit=10):
+    # The largest companies of the same industry, excluding the company itself.
+    industry = dataset.get("industry")
+    if not industry:
+        return []
+
+    own = normalize_company_url(url)
+    peers = [peer for peer in scrape_industry_companies(industry["url"]) if normalize_company_url(peer) != own]
+    return peers[:limit]
+
+
+# -----------------------------
+# Peer Metrics & Percentile Ranks
+# -----------------------------
+def peer_metrics(windowed_datasets, labels=None):
+    # One row per company (per label, if given), computed over the stacked
+    # windowed datasets in a single derive_metrics pass.
+    stacked = stack_datasets(windowed_datasets, keys=labels)
+    derived = derive_metrics(stacked)
+
+    ratios = (
+        stacked["ratios_df"]
+        .drop_duplicates(["Company", "Metric"])
+        .pivot(index="Company", columns="Metric", values="Value")
+        .reindex(index=derived.index, columns=["ROE", "ROCE"])
+    )
+    equity = derived["Equity Capital", "last"].fillna(0) + derived["Reserves", "last"]
+
+    return pd.DataFrame({
+        "ROE": ratios["ROE"],
+        "ROCE": ratios["ROCE"],
+        "OPM": derived["OPM", "last"],
+        "Sales CAGR": derived["Sales", "cagr"] * 100,
+        "Profit CAGR": derived["Net Profit", "cagr"] * 100,
+        "Debt to Equity": derived["Borrowings", "last"] / equity.where(equity > 0),
+    }, index=derived.index)
+
+
+def percentile_ranks(metrics):
+    # 0–100 percentile of each company within the peer set, where 100 is the
+    # best value; metrics where lower is better are flipped before ranking.
+    direction = pd.Series({metric: 1 if higher else -1 for metric, higher in PEER_METRICS.items()})
+    return (metrics[direction.index] * direction).rank(pct=True) * 100
+
+
+def compare_peers(url, dataset, analysis_window="Last Decade", limit=10, workers=8, load=load_cached_company):
+    # Loads the peers concurrently (cached datasets are reused) and ranks the
+    # company and its peers on PEER_METRICS. dataset is the company's own
+    # Year-indexed dataset. Returns metrics and ranks indexed by company
+    # label (see compare.company_labels), the company's own label and
+    # per-peer errors.
+    peers, errors = load_datasets(resolve_peers(url, dataset, limit), load, workers)
+
+    datasets = {url: dataset, **peers}
+    labels = company_labels(datasets)
+    windowed = [window_dataset(d, analysis_window) for d in datasets.values()]
+    metrics = peer_metrics(windowed, list(labels.values()))
+
+    return {
+        "company": labels[url],
+        "metrics": metrics,
+        "ranks": percentile_ranks(metrics),
+        "errors": pd.DataFrame(errors, columns=["URL", "Error"]),
+    }
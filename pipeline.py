@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+
+from cache import dataset_cache, normalize_company_url
+from fetch import fetcher
+from scraper import (
+    PageSnapshot,
+    build_dataset,
+    extract_company_records,
+    index_years,
+    scrape_company_name,
+    scrape_company_ratios,
+    scrape_industry,
+)
+from store import financial_store
+from timing import stage_timer
+
+
+logger = logging.getLogger(__name__)
+
+# Start of the first statement section; the top ratios, company header and
+# industry links all come before it on a Screener page.
+FIRST_STATEMENT = re.compile(r'<section[^>]*\bid="(?:quarters|profit-loss|balance-sheet|cash-flow|shareholding)"')
+
+
+# -----------------------------
+# Background Company Load
+# -----------------------------
+def overview_html(html):
+    # The part of the page above the statements, so the overview does not
+    # wait for the whole page to be parsed.
+    match = FIRST_STATEMENT.search(html)
+    return html if match is None else html[:match.start()]
+
+
+class CompanyLoad:
+    # Loads one company in a background thread, in stages: the page is
+    # fetched once, the top ratios are extracted from the head of the page
+    # and published as overview, then the statements are extracted, stored
+    # and the Year-indexed dataset is put in the dataset cache. Readers poll
+    # overview and finished instead of blocking on the whole scrape.
+    def __init__(self, url, store=financial_store, cache=dataset_cache):
+        self.url = url
+        self.store = store
+        self.cache = cache
+        self.overview = None
+        self.dataset = None
+        self.error = None
+        self.finished = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name=f"load-{normalize_company_url(self.url)}", daemon=True)
+            self._thread.start()
+        return self
+
+    def run(self):
+        try:
+            if self.store.is_fresh(self.url):
+                self._finish(index_years(self.store.load_company(self.url)))
+                return
+
+            html = fetcher.get_text(self.url)
+
+            with stage_timer.time("overview"):
+                page = PageSnapshot(self.url, overview_html(html), sections={"peers"})
+                company_name = scrape_company_name(page)
+                self.overview = {
+                    "company_name": company_name,
+                    "ratios_df": scrape_company_ratios(page, company_name),
+                    "industry": scrape_industry(page),
+                }
+
+            # Same HTML, parsed in full this time: no second download.
+            self.store.write(self.url, extract_company_records(PageSnapshot(self.url, html)))
+            self._finish(index_years(build_dataset(self.store.read(self.url))))
+        except Exception as e:
+            logger.warning("Load of %s failed: %s: %s", self.url, type(e).__name__, e)
+            self.error = e
+        finally:
+            self.finished.set()
+            _forget(self)
+
+    def _finish(self, dataset):
+        self.cache.put(self.url, dataset)
+        self.dataset = dataset
+
+    def result(self, timeout=None):
+        # The dataset once loaded; re-raises the error of a failed load.
+        self.finished.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.dataset
+
+
+_loads = {}
+_loads_lock = threading.Lock()
+
+
+def _forget(load):
+    with _loads_lock:
+        key = normalize_company_url(load.url)
+        if _loads.get(key) is load:
+            del _loads[key]
+
+
+def start_company_load(url, store=financial_store, cache=dataset_cache):
+    # A cached company comes back as an already finished load; otherwise
+    # sessions asking for the same company share one in-flight load.
+    dataset = cache.get(url)
+    if dataset is not None:
+        load = CompanyLoad(url, store, cache)
+        load.dataset = dataset
+        load.finished.set()
+        return load
+
+    with _loads_lock:
+        key = normalize_company_url(url)
+        if key not in _loads:
+            _loads[key] = CompanyLoad(url, store, cache).start()
+        return _loads[key]
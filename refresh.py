@@ -0,0 +1,172 @@
+import argparse
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from batch import read_url_list
+from cache import dataset_cache
+from fetch import host_limiter
+from scraper import index_years
+from store import financial_store
+
+
+logger = logging.getLogger(__name__)
+
+WATCHLIST_FILE = os.environ.get("WATCHLIST_FILE")
+REFRESH_INTERVAL = float(os.environ.get("WATCHLIST_REFRESH_INTERVAL", 3 * 60 * 60))
+
+LOG_COLUMNS = ["url", "company", "seconds", "refreshed_at", "error"]
+
+
+# -----------------------------
+# Watchlist Refresher
+# -----------------------------
+class WatchlistRefresher:
+    # Re-scrapes every watchlist company once per interval, spread evenly
+    # across the interval, and puts the fresh datasets in the on-disk store
+    # and the dataset cache. Page fetches still go through the shared
+    # per-host rate limiter. Keep the interval below the cache TTL, and the
+    # watchlist within the cache's max_entries, so that watched companies
+    # never go cold.
+    def __init__(self, urls, interval=REFRESH_INTERVAL, store=financial_store, cache=dataset_cache, on_refresh=None):
+        self.urls = list(urls)
+        self.interval = interval
+        self.store = store
+        self.cache = cache
+        self.on_refresh = on_refresh
+        if len(self.urls) > cache.max_entries:
+            logger.warning("Watchlist of %d companies exceeds the dataset cache's %d entries", len(self.urls), cache.max_entries)
+        self.history = deque(maxlen=1000)
+        self.latest = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self, url, force=True):
+        # force=False reuses a fresh stored copy instead of scraping.
+        start = time.perf_counter()
+        company = error = None
+
+        try:
+            dataset = self.store.refresh(url) if force else self.store.load_company(url)
+            self.cache.put(url, index_years(dataset))
+            company = dataset["company_name"]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        record = {
+            "url": url,
+            "company": company,
+            "seconds": time.perf_counter() - start,
+            "refreshed_at": time.time(),
+            "error": error,
+        }
+        self.history.append(record)
+        self.latest[url] = record
+
+        if error:
+            logger.warning("Refresh of %s failed after %.2fs: %s", url, record["seconds"], error)
+        else:
+            logger.info("Refreshed %s in %.2fs", url, record["seconds"])
+
+        if self.on_refresh is not None:
+            self.on_refresh(record)
+        return record
+
+    def warm(self):
+        # Loads every company once straight away, scraping only stale ones.
+        for url in self.urls:
+            if self._stop.is_set():
+                return
+            self.refresh(url, force=False)
+
+    def run_cycle(self):
+        stagger = self.interval / max(len(self.urls), 1)
+        for i, url in enumerate(self.urls):
+            if i and self._stop.wait(stagger):
+                return
+            self.refresh(url)
+
+    def run(self):
+        self.warm()
+        while not self._stop.wait(self.interval / max(len(self.urls), 1)):
+            self.run_cycle()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="watchlist-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_watchlist_refresher(path=WATCHLIST_FILE, interval=REFRESH_INTERVAL):
+    # One background refresher per process, for the App; a no-op without a
+    # watchlist file.
+    global _refresher
+
+    with _refresher_lock:
+        if _refresher is None and path:
+            with open(path, encoding="utf-8") as f:
+                _refresher = WatchlistRefresher(read_url_list(f), interval).start()
+    return _refresher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the financial store fresh for a watchlist of Screener companies.")
+    parser.add_argument("watchlist", help="text file with one Screener company URL per line")
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL, help="seconds between refreshes of the same company")
+    parser.add_argument("--once", action="store_true", help="refresh every company once, back to back, and exit")
+    parser.add_argument("--log", help="CSV file to append one latency row per refresh to")
+    parser.add_argument("--min-interval", type=float, default=host_limiter.min_interval, help="seconds between requests to the same host")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    host_limiter.min_interval = args.min_interval
+
+    with open(args.watchlist, encoding="utf-8") as f:
+        urls = read_url_list(f)
+
+    log_file = None
+    on_refresh = None
+    if args.log:
+        new_log = not os.path.exists(args.log)
+        log_file = open(args.log, "a", newline="", encoding="utf-8")
+        writer = csv.DictWriter(log_file, fieldnames=LOG_COLUMNS)
+        if new_log:
+            writer.writeheader()
+
+        def on_refresh(record):
+            writer.writerow(record)
+            log_file.flush()
+
+    refresher = WatchlistRefresher(urls, args.interval, on_refresh=on_refresh)
+    try:
+        if args.once:
+            for url in urls:
+                refresher.refresh(url)
+        else:
+            refresher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+    failed = sum(record["error"] is not None for record in refresher.latest.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
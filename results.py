@@ -0,0 +1,169 @@
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import time
+
+import pandas as pd
+
+from batch import read_url_list
+from cache import dataset_cache
+from fetch import fetcher, host_limiter
+from scoring import score_company
+from scraper import PageSnapshot, build_dataset, extract_company_records, index_years, quarterly_table, window_dataset
+from store import financial_store
+
+
+logger = logging.getLogger(__name__)
+
+DIFF_METRICS = ["Sales", "Net Profit", "OPM %"]
+
+
+# -----------------------------
+# Quarter Comparison
+# -----------------------------
+def quarter_dates(quarters):
+    return pd.to_datetime(pd.Series(quarters, dtype=object), format="%b %Y", errors="coerce")
+
+
+def latest_quarter(quarters):
+    dates = quarter_dates(quarters)
+    return None if dates.isna().all() else quarters[dates.idxmax()]
+
+
+def quarter_diff(pnl_q_df, quarter, metrics=DIFF_METRICS):
+    # The quarter's Sales, Net Profit and OPM against the prior quarter and
+    # the same quarter a year earlier. Changes are % for amounts and
+    # percentage points for OPM.
+    by_date = pnl_q_df.set_index(quarter_dates(pnl_q_df["Quarter"]).to_numpy()).sort_index()
+    date = pd.to_datetime(quarter, format="%b %Y")
+    metrics = [m for m in metrics if m in by_date.columns]
+
+    current = by_date.loc[date, metrics]
+    earlier = by_date[by_date.index < date]
+    prior = earlier.iloc[-1][metrics] if len(earlier) else pd.Series(float("nan"), index=metrics)
+    year_ago_date = date - pd.DateOffset(years=1)
+    year_ago = by_date.loc[year_ago_date, metrics] if year_ago_date in by_date.index else pd.Series(float("nan"), index=metrics)
+
+    def change(base):
+        points = pd.Series([m.endswith("%") for m in metrics], index=metrics)
+        return (current - base).where(points, (current - base) / base.abs() * 100)
+
+    return pd.DataFrame({
+        "Latest": current,
+        "Prior Quarter": prior,
+        "QoQ Change": change(prior),
+        "Year Ago": year_ago,
+        "YoY Change": change(year_ago),
+    }).astype(float)
+
+
+# -----------------------------
+# New Results Watcher
+# -----------------------------
+class ResultsWatcher:
+    # Polls watchlist company pages for a newly reported quarter. Each poll
+    # is a conditional GET (unchanged pages come back as 304 from the
+    # fetcher's validators) followed by a parse of the quarters table only;
+    # the full page is scraped, stored and re-scored only for companies with
+    # a new quarter.
+    def __init__(self, urls, analysis_window="Last Decade", store=financial_store, cache=dataset_cache):
+        self.urls = list(urls)
+        self.analysis_window = analysis_window
+        self.store = store
+        self.cache = cache
+        self._known = {}
+        self._page_hashes = {}
+
+    def known_quarter(self, url):
+        if url not in self._known:
+            quarters = self.store.read_section(url, "quarters")["Quarter"].unique().tolist()
+            self._known[url] = latest_quarter(quarters) if quarters else None
+        return self._known[url]
+
+    def check(self, url):
+        # Returns an alert dict when url has a new quarter, otherwise None.
+        html = fetcher.get_text(url)
+        page_hash = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        if self._page_hashes.get(url) == page_hash:
+            return None
+        self._page_hashes[url] = page_hash
+
+        _, quarters = quarterly_table(PageSnapshot(url, html, sections={"quarters"}))
+        quarter = latest_quarter(quarters) if quarters else None
+        known = self.known_quarter(url)
+        if quarter is None or quarter == known:
+            return None
+
+        # Same HTML, parsed in full this time: no second download.
+        records = extract_company_records(PageSnapshot(url, html))
+        self.store.write(url, records)
+        dataset = index_years(build_dataset(self.store.read(url)))
+        self.cache.put(url, dataset)
+        self._known[url] = quarter
+
+        if known is None:
+            # First sighting of this company: the stored copy is the baseline.
+            return None
+
+        alert = {
+            "url": url,
+            "company": dataset["company_name"],
+            "quarter": quarter,
+            "previous_quarter": known,
+            "diff": json.loads(quarter_diff(dataset["pnl_q_df"], quarter).to_json(orient="index")),
+            "confidence_score": score_company(window_dataset(dataset, self.analysis_window))["confidence_score"],
+            "detected_at": time.time(),
+        }
+        logger.info("New quarter %s for %s", quarter, alert["company"])
+        return alert
+
+    def poll(self):
+        alerts = []
+        for url in self.urls:
+            try:
+                alert = self.check(url)
+            except Exception as e:
+                logger.warning("Results check of %s failed: %s: %s", url, type(e).__name__, e)
+                continue
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch Screener companies for newly reported quarterly results.")
+    parser.add_argument("watchlist", help="text file with one Screener company URL per line")
+    parser.add_argument("--every", type=float, default=15 * 60, help="seconds between polls of the watchlist")
+    parser.add_argument("--once", action="store_true", help="poll once and exit")
+    parser.add_argument("-o", "--output", help="JSON Lines file to append alerts to (default stdout)")
+    parser.add_argument("--min-interval", type=float, default=host_limiter.min_interval, help="seconds between requests to the same host")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    host_limiter.min_interval = args.min_interval
+
+    with open(args.watchlist, encoding="utf-8") as f:
+        watcher = ResultsWatcher(read_url_list(f))
+
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        while True:
+            for alert in watcher.poll():
+                out.write(json.dumps(alert) + "\n")
+                out.flush()
+            if args.once:
+                break
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from analytics import derive_metrics
+from timing import timed
+
+
+FRAME_KEYS = ["ratios_df", "pnl_y_df", "balance_df", "cashflow_df", "shareholding_df"]
+
+
+# -----------------------------
+# Multi-company Frames
+# -----------------------------
+def keyed_dataset(dataset, key):
+    # The dataset with key in the Company column of its frames. Names are
+    # not unique: the standalone and consolidated pages of one company share
+    # theirs, and stacked under it their statements would pool into one.
+    return {**dataset, **{frame: dataset[frame].assign(Company=key) for frame in FRAME_KEYS}}
+
+
+def stack_datasets(datasets, keys=None):
+    # Every scraped frame already carries a Company column, so many windowed
+    # datasets score as one by concatenating frame by frame. With keys (one
+    # per dataset, e.g. its URL) the rows are labelled by key instead.
+    if keys is not None:
+        datasets = [keyed_dataset(d, key) for d, key in zip(datasets, keys)]
+    return {key: pd.concat([d[key] for d in datasets], ignore_index=True) for key in FRAME_KEYS}
+
+
+def _ratio(ratios_df, metric, companies):
+    values = ratios_df[ratios_df["Metric"] == metric].drop_duplicates("Company")
+    return values.set_index("Company")["Value"].reindex(companies)
+
+
+def _messages(flags):
+    # Boolean Company × message frame -> list of triggered messages per company, in column order.
+    stacked = flags.stack()
+    hits = stacked[stacked].reset_index(level=1).iloc[:, 0]
+    lists = hits.groupby(level=0).agg(list).reindex(flags.index)
+    return lists.apply(lambda found: found if isinstance(found, list) else [])
+
+
+# -----------------------------
+# Executive Confidence Scoring
+# -----------------------------
+@timed("score")
+def score_companies(stacked, derived=None):
+    # Scores windowed datasets (see scraper.window_dataset, stack_datasets)
+    # on growth, profitability, balance sheet, cash flow and governance,
+    # 0–20 each, plus a 10 point bonus for resilient, non-cyclical
+    # franchises. Returns one row per company. The series statistics come
+    # from analytics.derive_metrics, which callers may have built already.
+    ratios_df = stacked["ratios_df"]
+
+    companies = pd.Index(
+        pd.concat([stacked[key]["Company"] for key in FRAME_KEYS]).drop_duplicates(),
+        name="Company",
+    )
+
+    if derived is None:
+        derived = derive_metrics(stacked)
+    derived = derived.reindex(companies)
+
+
+    # 1. GROWTH QUALITY (0–20)
+
+    sales = derived["Sales"]
+    profit = derived["Net Profit"]
+
+    has_growth = (sales["count"] >= 3) & (profit["count"] >= 3)
+    sales_up = sales["last"] > sales["first"]
+    profit_up = profit["last"] > profit["first"]
+
+    grew = has_growth & sales_up & profit_up
+    profitless = has_growth & sales_up & ~profit_up
+    stalled = has_growth & ~sales_up
+
+    growth_score = np.select([grew, profitless, stalled], [16, 10, 8], 14)
+
+
+    # 2. PROFITABILITY & EFFICIENCY (0–20)
+
+    margins = derived["OPM"]
+
+    has_margins = margins["count"] >= 3
+    margin_change = margins["last"] - margins["first"]
+
+    # Detect cyclicality via margin volatility
+    is_cyclical = has_margins & (margins["std"] > 5)
+
+    expanded = has_margins & (margin_change > 1)
+    stable_margins = has_margins & ~expanded & (margin_change >= -2)
+    squeezed = has_margins & ~expanded & ~stable_margins
+
+    profitability_score = np.select([expanded, stable_margins, squeezed], [16, 15, 9], 14)
+
+    # ---- ROE / ROCE quality boost ----
+    strong_returns = (_ratio(ratios_df, "ROE", companies) >= 18) & (_ratio(ratios_df, "ROCE", companies) >= 18)
+    profitability_score = np.where(strong_returns, np.minimum(profitability_score + 2, 20), profitability_score)
+
+
+    # 3. FINANCIAL POSITION (0–20)
+
+    debt = derived["Borrowings"]
+    reserves = derived["Reserves"]
+
+    has_balance = (debt["count"] > 0) & (reserves["count"] > 0)
+
+    # Absolute (not %) leverage logic
+    minimal_debt = has_balance & (debt["max"] <= 0.1 * reserves["max"])
+
+    has_funding = has_balance & ~minimal_debt & (debt["count"] >= 3) & (reserves["count"] >= 3)
+    self_funded = has_funding & (reserves["step"] >= debt["step"])
+    debt_led = has_funding & ~self_funded
+
+    balance_score = np.select([minimal_debt, self_funded, debt_led], [18, 16, 9], 14)
+
+
+    # 4. CASH FLOW QUALITY (0–20)
+
+    ocf = derived["Operating Cash Flow"]
+    cf_profit = derived["Cash Flow Net Profit"]
+
+    has_cashflow = (ocf["count"] >= 3) & (cf_profit["count"] >= 3)
+
+    ocf_beats = derived["OCF Above Profit", "sum"]
+    conversion = derived["OCF Conversion", "mean"]
+
+    cash_rich = has_cashflow & (ocf_beats >= ocf["count"] - 1)
+    cash_backed = has_cashflow & ~cash_rich & (conversion >= 0.8)
+    cash_weak = has_cashflow & ~cash_rich & ~cash_backed
+
+    cashflow_score = np.select([cash_rich, cash_backed, cash_weak], [20, 17, 9], 15)
+
+
+    # 5. GOVERNANCE & OWNERSHIP (0–20)
+
+    promoters = derived["Promoters"]
+
+    has_promoters = promoters["count"] >= 3
+    promoters_stable = has_promoters & (promoters["last"] - promoters["first"] >= -1.0)
+    promoters_falling = has_promoters & ~promoters_stable
+
+    governance_score = np.select([promoters_stable, promoters_falling], [16, 9], 14)
+
+
+    confidence_score = (growth_score + profitability_score + balance_score + cashflow_score + governance_score )
+
+    quality_checks = (
+        (cashflow_score >= 16).astype(int)
+        + (balance_score >= 15)
+        + (profitability_score >= 14)
+        + (governance_score >= 14)
+    )
+
+    franchise = (quality_checks >= 3) & ~is_cyclical
+    confidence_score = confidence_score + np.where(franchise, 10, 0)
+
+    strengths = _messages(pd.DataFrame({
+        "Revenue and profits have grown consistently.": grew,
+        "Operating margins have expanded.": expanded,
+        "Operating margins have remained broadly stable.": stable_margins,
+        "Strong ROE and ROCE indicate efficient capital usage.": strong_returns,
+        "Minimal leverage supported by a strong reserve base.": minimal_debt,
+        "Balance sheet growth is largely internally funded.": self_funded,
+        "Operating cash flows consistently exceed reported profits.": cash_rich,
+        "Profits are well supported by operating cash flows.": cash_backed,
+        "Promoter shareholding has remained broadly stable.": promoters_stable,
+        "The company exhibits characteristics of a high-quality, resilient business franchise.": franchise,
+    }, index=companies))
+
+    risks = _messages(pd.DataFrame({
+        "Revenue growth has not translated into profit growth.": profitless,
+        "Business growth momentum appears weak or inconsistent.": stalled,
+        "Operating margins have seen sustained pressure.": squeezed,
+        "Borrowings are rising faster than internal reserves.": debt_led,
+        "Weak cash conversion relative to reported profits.": cash_weak,
+        "Declining promoter shareholding observed.": promoters_falling,
+    }, index=companies))
+
+    return pd.DataFrame({
+        "growth_score": growth_score,
+        "profitability_score": profitability_score,
+        "balance_score": balance_score,
+        "cashflow_score": cashflow_score,
+        "governance_score": governance_score,
+        "is_cyclical": is_cyclical,
+        "confidence_score": confidence_score,
+        "strengths": strengths,
+        "risks": risks,
+    }, index=companies).reset_index()
+
+
+def score_company(dataset, derived=None):
+    # A single windowed dataset is already a one-company stack.
+    row = score_companies(dataset, derived).iloc[0]
+    return {
+        "growth_score": int(row["growth_score"]),
+        "profitability_score": int(row["profitability_score"]),
+        "balance_score": int(row["balance_score"]),
+        "cashflow_score": int(row["cashflow_score"]),
+        "governance_score": int(row["governance_score"]),
+        "is_cyclical": bool(row["is_cyclical"]),
+        "confidence_score": int(row["confidence_score"]),
+        "strengths": row["strengths"],
+        "risks": row["risks"],
+    }
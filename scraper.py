@@ -0,0 +1,503 @@
+import os
+import re
+from collections import Counter
+from functools import partial
+from urllib.parse import urljoin
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+
+from fetch import fetcher
+from timing import stage_timer, timed
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+PARSER = os.environ.get("SCREENER_PARSER", DEFAULT_PARSER)
+
+SCREENER_URL = "https://www.screener.in/"
+
+# The only parts of a company page the scrapers read.
+SECTION_IDS = {"quarters", "profit-loss", "balance-sheet", "cash-flow", "shareholding", "peers"}
+
+
+def clean_numeric_value(text):
+    if text is None:
+        return None
+
+    text = text.replace("₹", "").replace(",", "").strip()
+
+    if "Cr" in text:
+        number = text.replace("Cr.", "").replace("Cr", "").strip()
+        try:
+            return float(number) * 10000000
+        except:
+            return None
+
+    if text in ["", "-", "—"]:
+        return None
+
+    if "%" in text:
+        return float(text.replace("%", ""))
+
+    try:
+        return float(text)
+    except:
+        return None
+
+
+# Cells that clean_numeric_value maps to None, spelled so float() reads them as NaN.
+BLANK_CELLS = {"": "nan", "-": "nan", "—": "nan"}
+
+
+def clean_numeric_values(texts):
+    # Column-wise clean_numeric_value for raw table cells. ₹, commas and %
+    # are stripped from the whole column in one pass and the cells parsed
+    # straight into a float64 array, NaN where a cell is blank or a dash.
+    texts = list(texts)
+    if not texts:
+        return np.empty(0)
+
+    joined = "\x1f".join(texts)
+
+    if "Cr" not in joined:
+        cells = list(map(str.strip, joined.replace(",", "").replace("%", "").replace("₹", "").split("\x1f")))
+        try:
+            return np.fromiter(map(float, map(BLANK_CELLS.get, cells, cells)), dtype=np.float64, count=len(cells))
+        except ValueError:
+            pass
+
+    # Crore amounts or text cells: fall back to cleaning cell by cell.
+    return np.array([clean_numeric_value(text.strip()) for text in texts], dtype=np.float64)
+
+
+def table_cells(table, periods):
+    # Metric, period and cleaned value of every cell in one Screener data
+    # table, cleaned in a single pass instead of one dict per cell.
+    metrics = []
+    row_periods = []
+    cells = []
+
+    for row in table.find("tbody").find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) <= 1:
+            continue
+
+        values = [td.text for td in cols[1:]][:len(periods)]
+        metrics.extend([cols[0].text.strip()] * len(values))
+        row_periods.extend(periods[:len(values)])
+        cells.extend(values)
+
+    return metrics, row_periods, clean_numeric_values(cells)
+
+
+def table_records(table, periods, company, period_col="Year"):
+    metrics, row_periods, values = table_cells(table, periods)
+
+    return pd.DataFrame({
+        "Company": company,
+        period_col: row_periods,
+        "Metric": metrics,
+        "Value": values,
+    })
+
+
+def table_statement(table, periods, company, period_col="Year"):
+    metrics, row_periods, values = table_cells(table, periods)
+    return build_statement([company] * len(values), row_periods, metrics, values, period_col)
+
+
+# -----------------------------
+# Page Snapshot
+# -----------------------------
+def _is_scraped_element(name, attrs, sections=SECTION_IDS):
+    if name == "section":
+        return attrs.get("id") in sections
+    if name == "ul":
+        return attrs.get("id") == "top-ratios"
+    if name == "div":
+        # Company name header, see scrape_company_name
+        return "hide-from-tablet-landscape" in str(attrs.get("class", ""))
+    return False
+
+
+class PageSnapshot:
+    # Fetches and parses a company page once so every scraper below can
+    # share the same parsed tree instead of re-downloading the page.
+    # With targeted=True only the scraped sections (or the given subset of
+    # SECTION_IDS) are built into the tree; parser="html.parser",
+    # targeted=False is the plain bs4 fallback.
+    def __init__(self, url, html=None, parser=None, targeted=True, sections=SECTION_IDS):
+        self.url = url
+        self.html = fetcher.get_text(url) if html is None else html
+        self.parser = parser or PARSER
+        parse_only = SoupStrainer(partial(_is_scraped_element, sections=sections)) if targeted else None
+        with stage_timer.time("parse", bytes=len(self.html)):
+            self.soup = BeautifulSoup(self.html, self.parser, parse_only=parse_only)
+
+
+#------------------------------
+# Company Name
+# -----------------------------
+def scrape_company_name(page):
+    soup = page.soup
+    division = soup.find("div", class_= "flex flex-space-between container hide-from-tablet-landscape" )
+    name= division.find("h1",class_="h2 shrink-text").text.split()
+    company_name = (" ".join(name))
+    return company_name
+    
+
+def scrape_sector(page):
+    soup = page.soup
+
+    section = soup.find("section", id="peers")
+    p = section.find("p", class_="sub")
+    Broad_sector = p.find("a", title="Broad Sector")
+    Sector =  p.find("a", title="Sector")
+    Broad_Industry = p.find("a", title="Broad Industry")
+    Industry = p.find("a", title="Industry")
+
+
+
+    data = {
+        "Broad Sector": Broad_sector ,
+        "Sector": Sector ,
+        "Broad Industry": Broad_Industry ,
+        "Industry": Industry
+    }
+
+    return pd.DataFrame([data])  
+
+
+def scrape_industry(page):
+    # Name and absolute URL of the company's industry listing, or None.
+    section = page.soup.find("section", id="peers")
+    link = section.find("a", title="Industry") if section else None
+    if link is None or not link.get("href"):
+        return None
+    return {"name": link.get_text(strip=True), "url": urljoin(page.url or SCREENER_URL, link["href"])}
+
+
+def scrape_industry_companies(industry_url, html=None):
+    # Company page URLs listed on an industry page, in listing order
+    # (Screener sorts them by market cap).
+    page = PageSnapshot(industry_url, html, targeted=False)
+    urls = []
+    for table in page.soup.find_all("table"):
+        for link in table.find_all("a", href=True):
+            if link["href"].startswith("/company/"):
+                url = urljoin(SCREENER_URL, link["href"])
+                if url not in urls:
+                    urls.append(url)
+    return urls
+
+# -----------------------------
+# Top Ratios
+# -----------------------------
+def scrape_company_ratios(page, company):
+    soup = page.soup
+
+    ratios = soup.find("ul", id="top-ratios")
+    data = []
+
+    for li in ratios.find_all("li"):
+        name = li.find("span", class_="name").text.strip()
+        value_text = li.find("span", class_="value").text.strip()
+
+        if "High / Low" in name:
+            high, low = value_text.replace("₹", "").replace(",", "").split("/")
+            data.append([company, "52W High", float(high)])
+            data.append([company, "52W Low", float(low)])
+        else:
+            data.append([company, name, clean_numeric_value(value_text)])
+
+    return pd.DataFrame(data, columns=["Company", "Metric", "Value"])
+
+
+
+# -----------------------------
+# Generic Financial Table Scraper
+# -----------------------------
+MONTH = re.compile(r"^(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+")
+
+
+def year_labels(periods):
+    # "Mar 2024" -> "2024". Long records keep the raw header, so a half-year
+    # "Sep 2024" stays apart from "Mar 2024" until a statement is built.
+    return [MONTH.sub("", str(period).strip()) for period in periods]
+
+
+def interim_periods(periods):
+    # Yearly columns not ending in the fiscal year-end month, i.e. the
+    # trailing half-year "Sep 2024" next to "Mar 2014" ... "Mar 2024".
+    months = Counter(str(period).split()[0] for period in periods if MONTH.match(str(period)))
+    if not months:
+        return set()
+    year_end = months.most_common(1)[0][0]
+    return {period for period in periods if MONTH.match(str(period)) and not str(period).startswith(year_end)}
+
+
+def financial_table(page, section_id):
+    soup = page.soup
+
+    section = soup.find("section", id=section_id)
+    table = section.find("table")
+
+    # Raw headers ("Mar 2024", "Sep 2024", "TTM"); see year_labels.
+    periods = [th.text.strip() for th in table.find("thead").find_all("th")[1:]]
+
+    return table, periods
+
+
+def scrape_financial_section(page, section_id, company):
+    table, periods = financial_table(page, section_id)
+    return table_records(table, periods, company)
+
+
+def scrape_financial_statement(page, section_id, company):
+    table, periods = financial_table(page, section_id)
+    return table_statement(table, year_labels(periods), company)
+
+# ---------------------------
+# Yearly Shareholding Scraper
+# ---------------------------
+
+def shareholding_table(page):
+    soup = page.soup
+    
+    yearly_div = soup.find("section",id ="shareholding").find("div", id="yearly-shp")
+    table = yearly_div.find("table", class_="data-table")
+    periods = [th.text.strip() for th in table.find("thead").find_all("th")[1:]]
+
+    return table, periods
+
+
+def scrape_yearly_shareholding(page, company):
+    table, periods = shareholding_table(page)
+    return table_records(table, periods, company)
+
+
+def scrape_shareholding_statement(page, company):
+    table, periods = shareholding_table(page)
+    return table_statement(table, year_labels(periods), company)
+
+# -----------------------------
+# Quarterly Profit & Loss Scraper
+# -----------------------------
+def quarterly_table(page):
+    soup = page.soup
+
+    section = soup.find("section", id="quarters")
+    if section is None:
+        return None, []
+
+    table = section.find("table")
+    thead = table.find("thead")
+
+    quarters = []
+
+    # Extract quarters
+    for th in thead.find_all("th")[1:]:
+        quarters.append(th.text.strip())
+
+    return table, quarters
+
+
+def scrape_quarterly_records(page, company):
+    table, quarters = quarterly_table(page)
+    if table is None:
+        return pd.DataFrame()
+    return table_records(table, quarters, company, "Quarter")
+
+
+def scrape_pnl_quarterly(page, company):
+    table, quarters = quarterly_table(page)
+    if table is None:
+        return pd.DataFrame()
+    return table_statement(table, quarters, company, "Quarter")
+ 
+
+# -----------------------------
+# Wide Statements
+# -----------------------------
+@timed("pivot")
+def build_statement(companies, periods, metrics, values, period_col="Year", on_duplicate="first"):
+    # Builds the wide Company × period statement straight from per-cell
+    # arrays into one preallocated float64 matrix, without pivot_table's
+    # groupby. A (company, period, metric) cell can repeat, e.g. "Mar 2024"
+    # and "Sep 2024" both become 2024; on_duplicate keeps the "first" or
+    # "last" value in input order, or their "mean" as pivot_table did.
+    values = np.asarray(values, dtype=np.float64)
+    company_codes, company_names = pd.factorize(pd.Index(list(companies), dtype=object))
+    period_codes, period_names = pd.factorize(pd.Index(list(periods), dtype=object))
+    metric_codes, metric_names = pd.factorize(pd.Index(list(metrics), dtype=object))
+
+    # One row per (company, period) pair, in order of first appearance.
+    row_codes, row_keys = pd.factorize(company_codes * len(period_names) + period_codes)
+
+    present = ~np.isnan(values)
+    row_codes, metric_codes, values = row_codes[present], metric_codes[present], values[present]
+
+    matrix = np.full((len(row_keys), len(metric_names)), np.nan)
+
+    if on_duplicate == "mean":
+        totals = np.zeros(matrix.shape)
+        counts = np.zeros(matrix.shape)
+        np.add.at(totals, (row_codes, metric_codes), values)
+        np.add.at(counts, (row_codes, metric_codes), 1)
+        np.divide(totals, counts, out=matrix, where=counts > 0)
+    elif on_duplicate in ("first", "last"):
+        keep = ~pd.Index(row_codes * len(metric_names) + metric_codes).duplicated(keep=on_duplicate)
+        matrix[row_codes[keep], metric_codes[keep]] = values[keep]
+    else:
+        raise ValueError(f"on_duplicate must be 'last', 'first' or 'mean', not {on_duplicate!r}")
+
+    # Like pivot_table, leave out metrics and periods that have no values at all.
+    filled = ~np.isnan(matrix)
+    has_row = filled.any(axis=1)
+    has_metric = filled.any(axis=0)
+    row_keys = row_keys[has_row]
+
+    statement = pd.DataFrame(matrix[has_row][:, has_metric], columns=pd.Index(metric_names[has_metric], name="Metric"))
+    statement.insert(0, period_col, period_names.take(row_keys % max(len(period_names), 1)))
+    statement.insert(0, "Company", company_names.take(row_keys // max(len(period_names), 1)))
+    return statement
+
+
+def process_statement(df, period_col="Year", on_duplicate="first"):
+    # Yearly statements keep the fiscal year-end column of each year: it
+    # comes before the half-year one on the page and in the store, and
+    # "Sep 2024" is an interim of the next fiscal year, not of 2024.
+    periods = year_labels(df[period_col]) if period_col == "Year" else df[period_col]
+    return build_statement(df["Company"], periods, df["Metric"], df["Value"], period_col, on_duplicate)
+
+
+def process_quarterly(df):
+    if df.empty:
+        return pd.DataFrame()
+    return process_statement(df, "Quarter")
+
+
+def clean_year_column(df):
+    df = df.copy()
+
+    # Convert to string and clean whitespace
+    df["Year"] = df["Year"].astype(str).str.strip()
+
+    # Extract 4-digit year only (e.g. 2016 from "2016\n18m")
+    df["Year"] = df["Year"].str.extract(r"(\d{4})", expand=False)
+
+    # Drop rows where year could not be extracted
+    df = df.dropna(subset=["Year"])
+
+    # Convert to int
+    df["Year"] = df["Year"].astype(int)
+
+    return df
+
+
+# -----------------------------
+# Analysis Window
+# -----------------------------
+ANALYSIS_WINDOWS = {
+    "Last Decade": 10,
+    "Last 3 Years": 3,
+    "Last 5 Years": 5,
+    "Last 7 Years": 7,
+}
+
+
+YEARLY_FRAMES = ["pnl_y_df", "balance_df", "cashflow_df", "shareholding_df"]
+
+
+@timed("clean")
+def index_years(dataset):
+    # Cleans the yearly frames once and indexes them by the integer Year in
+    # ascending order, so every analysis window is a slice of the same frame.
+    indexed = {}
+    for key in YEARLY_FRAMES:
+        df = clean_year_column(dataset[key]).sort_values("Year", kind="stable")
+        df.index = pd.Index(df["Year"].to_numpy())
+        indexed[key] = df
+    return {**dataset, **indexed}
+
+
+@timed("window")
+def window_dataset(dataset, analysis_window):
+    # Expects frames from index_years; slicing a sorted index returns views,
+    # so switching windows copies nothing.
+    start_year = dataset["pnl_y_df"]["Year"].max() - (ANALYSIS_WINDOWS[analysis_window] - 1)
+
+    return {
+        **dataset,
+        **{key: dataset[key].iloc[dataset[key].index.searchsorted(start_year):] for key in YEARLY_FRAMES},
+    }
+
+
+# -----------------------------
+# Company Dataset
+# -----------------------------
+def strip_plus_suffix(df):
+    if len(df.columns) == 0:
+        return df
+    df.columns = (df.columns.str.replace(r"\s*\+\s*$", "", regex=True).str.strip())
+    return df
+
+
+def scrape_company_records(url):
+    return extract_company_records(PageSnapshot(url))
+
+
+@timed("scrape")
+def extract_company_records(page):
+    company_name = scrape_company_name(page)
+
+    return {
+        "company_name": company_name,
+        "ratios": scrape_company_ratios(page, company_name),
+        "quarters": scrape_quarterly_records(page, company_name),
+        "profit-loss": scrape_financial_section(page, "profit-loss", company_name),
+        "balance-sheet": scrape_financial_section(page, "balance-sheet", company_name),
+        "cash-flow": scrape_financial_section(page, "cash-flow", company_name),
+        "shareholding": scrape_yearly_shareholding(page, company_name),
+        "industry": scrape_industry(page),
+    }
+
+
+def build_dataset(records):
+    return {
+        "company_name": records["company_name"],
+        "ratios_df": records["ratios"],
+        "pnl_q_df": strip_plus_suffix(process_quarterly(records["quarters"])),
+        "pnl_y_df": strip_plus_suffix(process_statement(records["profit-loss"])),
+        "balance_df": strip_plus_suffix(process_statement(records["balance-sheet"])),
+        "cashflow_df": strip_plus_suffix(process_statement(records["cash-flow"])),
+        "shareholding_df": strip_plus_suffix(process_statement(records["shareholding"])),
+        "industry": records.get("industry"),
+    }
+
+
+@timed("scrape")
+def extract_company_dataset(page):
+    # Same dataset as build_dataset(extract_company_records(page)), with each
+    # statement built wide straight from its HTML table.
+    company_name = scrape_company_name(page)
+
+    return {
+        "company_name": company_name,
+        "ratios_df": scrape_company_ratios(page, company_name),
+        "pnl_q_df": strip_plus_suffix(scrape_pnl_quarterly(page, company_name)),
+        "pnl_y_df": strip_plus_suffix(scrape_financial_statement(page, "profit-loss", company_name)),
+        "balance_df": strip_plus_suffix(scrape_financial_statement(page, "balance-sheet", company_name)),
+        "cashflow_df": strip_plus_suffix(scrape_financial_statement(page, "cash-flow", company_name)),
+        "shareholding_df": strip_plus_suffix(scrape_shareholding_statement(page, company_name)),
+        "industry": scrape_industry(page),
+    }
+
+
+def load_company(url):
+    return extract_company_dataset(PageSnapshot(url))
@@ -0,0 +1,242 @@
+import argparse
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import DERIVED, METRICS
+from cube import build_cube, cube_dir, open_cube, read_cube_index, save_cube
+from store import financial_store
+
+
+UNIVERSE_MAX_AGE = 15 * 60
+
+# Metrics reported in percent, whose "stable" is judged in points.
+PERCENT_METRICS = {"OPM", "Promoters", "FIIs", "DIIs", "Public"}
+STABLE_POINTS = 1.0
+STABLE_CHANGE = 0.05
+
+STATS = ["cagr", "growth", "change", "mean", "first", "last"]
+
+CONDITION = re.compile(
+    r"^(?:(?P<years>\d+)[- ]?(?:year|yr)s?\s+)?(?P<field>.+?)(?:\s+(?P<stat>" + "|".join(STATS) + r"))?"
+    r"\s*(?:(?P<trend>\brising|\bfalling|\bstable)|(?P<op>>=|<=|==|!=|>|<|=)\s*(?P<number>-?[\d.]+)\s*(?P<percent>%?))$",
+    re.IGNORECASE,
+)
+
+
+# -----------------------------
+# Universe Cube
+# -----------------------------
+class UniverseCache:
+    # The financial cube of one store (see cube.FinancialCube), rebuilt at
+    # most once per max_age and saved under <store root>/_universe/. Every
+    # process maps the same files read-only, so Streamlit workers and CLI
+    # runs share one copy in the OS page cache instead of each holding its
+    # own; a rebuild by any of them is picked up by the others on next get.
+    def __init__(self, store=financial_store, max_age=UNIVERSE_MAX_AGE):
+        self.store = store
+        self.max_age = max_age
+        self._cube = None
+        self._lock = threading.Lock()
+
+    def get(self, rebuild=False):
+        with self._lock:
+            directory = cube_dir(self.store)
+            index = None if rebuild else read_cube_index(directory)
+            if index is not None and time.time() - index["built_at"] <= self.max_age:
+                if self._cube is None or self._cube.built_at != index["built_at"]:
+                    try:
+                        self._cube = open_cube(directory, index)
+                    except FileNotFoundError:
+                        # Replaced by another process's rebuild since the index was read.
+                        self._cube = open_cube(directory)
+                return self._cube
+
+            save_cube(build_cube(self.store), directory)
+            self._cube = open_cube(directory)
+            return self._cube
+
+
+universe_cache = UniverseCache()
+
+
+# -----------------------------
+# Series Statistics
+# -----------------------------
+def series_stats(cube, metric, years):
+    # first, last, mean, count and span of every company's series of one
+    # metric over its latest `years` years, in one vectorized pass over the
+    # metric's company × year slice of the cube.
+    stats = pd.DataFrame(np.nan, index=cube.companies, columns=["first", "last", "mean", "count", "span"])
+    stats["count"] = 0
+
+    series = cube.metric(metric)
+    if series is None or not series.size:
+        return stats
+
+    present = ~np.isnan(series)
+    reported = present.any(axis=1)
+    columns = np.arange(series.shape[1])
+    last = series.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    window = present & (columns > (last - years)[:, None])
+    first = np.argmax(window, axis=1)
+    count = window.sum(axis=1)
+    rows = np.arange(len(series))
+
+    with np.errstate(invalid="ignore"):
+        stats["first"] = np.where(reported, series[rows, first], np.nan)
+        stats["last"] = np.where(reported, series[rows, last], np.nan)
+        stats["mean"] = np.where(reported, np.where(window, series, 0).sum(axis=1) / count, np.nan)
+    stats["count"] = count
+    stats["span"] = np.where(reported, last - first, np.nan)
+    return stats
+
+
+def stat_values(stats, stat):
+    first, last, span = stats["first"], stats["last"], stats["span"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if stat == "cagr":
+            return ((last / first) ** (1 / span) - 1).where((first > 0) & (last > 0) & (span > 0))
+        if stat == "growth":
+            return (last / first - 1).where(first > 0)
+        if stat == "change":
+            return last - first
+        return stats[stat]
+
+
+def trend_flags(stats, metric, trend):
+    change = stats["last"] - stats["first"]
+    if metric in PERCENT_METRICS:
+        stable = change.abs() <= STABLE_POINTS
+    else:
+        stable = (change / stats["first"].abs()).abs() <= STABLE_CHANGE
+
+    has_trend = stats["count"] >= 2
+    if trend == "stable":
+        return has_trend & stable
+    if trend == "rising":
+        return has_trend & ~stable & (change > 0)
+    return has_trend & ~stable & (change < 0)
+
+
+# -----------------------------
+# Screen Queries
+# -----------------------------
+def metric_aliases():
+    # Lower-case name -> analytics metric, accepting statement labels such
+    # as "OPM %" or "Cash from Operating Activity" as well.
+    aliases = {column.lower(): metric for metric, (_, column) in METRICS.items() if column}
+    aliases["cash from operating activity"] = "Operating Cash Flow"
+    aliases.update({metric.lower(): metric for metric in list(METRICS) + DERIVED})
+    return aliases
+
+
+def parse_query(query):
+    # "ROCE > 18, 5-year Sales CAGR > 12%, Borrowings falling, Promoters
+    # stable" -> one dict per condition. Conditions are separated by commas,
+    # semicolons or "and".
+    conditions = []
+    for text in re.split(r",|;|\band\b", query):
+        text = text.strip()
+        if not text:
+            continue
+        match = CONDITION.match(text)
+        if match is None:
+            raise ValueError(f"Cannot read condition {text!r}")
+        condition = {key: value for key, value in match.groupdict().items()}
+        condition["text"] = text
+        conditions.append(condition)
+    return conditions
+
+
+def _compare(values, op, number):
+    return {
+        ">": values > number,
+        ">=": values >= number,
+        "<": values < number,
+        "<=": values <= number,
+        "=": values == number,
+        "==": values == number,
+        "!=": values != number,
+    }[op]
+
+
+def screen(query, universe=None, years=10):
+    # Companies of the universe (by store slug) meeting every condition of
+    # the query, with their name and one column per condition holding the
+    # value it was tested on. A ratio
+    # (ROCE, ROE, Stock P/E, ...) is read from the latest top ratios; any
+    # other field is a statement metric over each company's latest `years`
+    # years (or the condition's own "N-year"), last value by default.
+    universe = universe_cache.get() if universe is None else universe
+    if not len(universe.companies):
+        raise ValueError("No companies stored yet: analyze or batch-load some companies first")
+    ratios = universe.ratio_frame()
+    companies = universe.companies
+
+    ratio_names = {name.lower(): name for name in ratios.columns}
+    aliases = metric_aliases()
+
+    matches = pd.Series(True, index=companies)
+    columns = {}
+    for condition in parse_query(query):
+        field = condition["field"].strip().lower()
+        stat = (condition["stat"] or "").lower()
+        window = int(condition["years"] or years)
+
+        if field in ratio_names and not stat and not condition["trend"] and not condition["years"]:
+            tested = ratios[ratio_names[field]]
+        elif field in aliases:
+            metric = aliases[field]
+            stats = series_stats(universe, metric, window)
+            if condition["trend"]:
+                flags = trend_flags(stats, metric, condition["trend"].lower()).fillna(False).astype(bool)
+                matches &= flags
+                columns[condition["text"]] = stat_values(stats, "change")
+                continue
+            tested = stat_values(stats, stat or "last")
+        else:
+            raise ValueError(f"Unknown field {condition['field']!r} in {condition['text']!r}")
+
+        number = float(condition["number"])
+        if condition["percent"] and stat in ("cagr", "growth"):
+            number /= 100
+
+        matches &= _compare(tested, condition["op"], number).fillna(False).astype(bool)
+        columns[condition["text"]] = tested
+
+    results = pd.DataFrame({"Name": universe.names, **columns}, index=companies)
+    return results[matches.to_numpy()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen every company in the financial store with one query.")
+    parser.add_argument("query", help='e.g. "ROCE > 18, 5-year Sales CAGR > 12%%, Borrowings falling, Promoters stable"')
+    parser.add_argument("--years", type=int, default=10, help="years of history used when a condition names none")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the universe from the store first")
+    parser.add_argument("-o", "--output", help="CSV file for the matching companies (default stdout)")
+    args = parser.parse_args(argv)
+
+    universe = universe_cache.get(rebuild=args.rebuild)
+    try:
+        results = screen(args.query, universe, args.years)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.output:
+        results.to_csv(args.output)
+    else:
+        print(results.to_string())
+    print(f"{len(results)} of {len(universe.companies)} companies match", file=sys.stderr)
+    if universe.skipped:
+        print(f"{len(universe.skipped)} stored companies could not be loaded and were skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
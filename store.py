@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from cache import dataset_cache, normalize_company_url
+from scraper import build_dataset, index_years, interim_periods, scrape_company_records
+from timing import timed
+
+
+STORE_DIR = os.environ.get("FINANCIAL_STORE_DIR", "financial_store")
+
+# Long-format sections and the column holding their reporting period.
+SECTIONS = {
+    "quarters": "Quarter",
+    "profit-loss": "Year",
+    "balance-sheet": "Year",
+    "cash-flow": "Year",
+    "shareholding": "Year",
+}
+
+# Periods whose values keep changing until they close, e.g. trailing twelve
+# months; half-year columns such as "Sep 2024" are open as well.
+OPEN_PERIODS = ["TTM"]
+
+
+# -----------------------------
+# On-disk Financial Store
+# -----------------------------
+class FinancialStore:
+    # Keeps each company's long records as Parquet files:
+    #   <root>/<slug>/<section>/part-<ns>-<id>.parquet  closed periods, append-only
+    #   <root>/<slug>/<section>/open.parquet            open periods, rewritten
+    #   <root>/<slug>/ratios.parquet                    latest top ratios snapshot
+    #   <root>/<slug>/meta.json                         company name and fetch time
+    # Periods are the raw column headers ("Mar 2024"). A refresh appends new
+    # closed periods and restated values; on read the latest part wins.
+    # Files are written aside and swapped in, so reads never see them half
+    # written, in this process or another.
+    def __init__(self, root=STORE_DIR, max_age=24 * 60 * 60):
+        self.root = root
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def company_dir(self, url):
+        return os.path.join(self.root, *normalize_company_url(url).split("/"))
+
+    def read_meta(self, url):
+        path = os.path.join(self.company_dir(url), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def companies(self):
+        # URL and fetch time of every stored company.
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if "meta.json" in filenames:
+                with open(os.path.join(dirpath, "meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+                found[meta["url"]] = meta["fetched_at"]
+                # Only a consolidated sub-company can sit below a company.
+                dirnames[:] = [d for d in dirnames if d == "consolidated"]
+        return found
+
+    def is_fresh(self, url):
+        meta = self.read_meta(url)
+        return meta is not None and time.time() - meta["fetched_at"] <= self.max_age
+
+    def expire(self, url):
+        meta = self.read_meta(url)
+        if meta is not None:
+            meta["fetched_at"] = 0
+            self._write_meta(url, meta)
+
+    @timed("store")
+    def read(self, url):
+        # Every row carries the current company name from meta, so periods
+        # stored before a rename stay with the same company.
+        company_dir = self.company_dir(url)
+        meta = self.read_meta(url)
+        if meta is None:
+            return None
+
+        company = meta["company_name"]
+        with self._lock:
+            records = {
+                "company_name": company,
+                "industry": meta.get("industry"),
+                "ratios": pd.read_parquet(os.path.join(company_dir, "ratios.parquet")).assign(Company=company),
+            }
+            for section, period_col in SECTIONS.items():
+                records[section] = self._read_section(os.path.join(company_dir, section), period_col, company)
+
+        return records
+
+    def read_section(self, url, section):
+        meta = self.read_meta(url)
+        company = None if meta is None else meta["company_name"]
+        with self._lock:
+            return self._read_section(os.path.join(self.company_dir(url), section), SECTIONS[section], company)
+
+    def write(self, url, records):
+        company_dir = self.company_dir(url)
+
+        with self._lock:
+            os.makedirs(company_dir, exist_ok=True)
+            _write_parquet(records["ratios"], os.path.join(company_dir, "ratios.parquet"))
+
+            for section, period_col in SECTIONS.items():
+                self._append_section(os.path.join(company_dir, section), records[section], period_col)
+
+            self._write_meta(url, {
+                "company_name": records["company_name"],
+                "industry": records.get("industry"),
+                "url": url,
+                "fetched_at": time.time(),
+            })
+
+    def load_company(self, url):
+        # Read from disk while fresh; otherwise scrape, append the new
+        # periods and rebuild from the full stored history.
+        if not self.is_fresh(url):
+            return self.refresh(url)
+        return build_dataset(self.read(url))
+
+    def refresh(self, url):
+        # Scrape now, whatever the age of the stored copy.
+        self.write(url, scrape_company_records(url))
+        return build_dataset(self.read(url))
+
+    def _write_meta(self, url, meta):
+        path = os.path.join(self.company_dir(url), "meta.json")
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _read_section(self, section_dir, period_col, company=None):
+        if not os.path.isdir(section_dir):
+            return pd.DataFrame(columns=["Company", period_col, "Metric", "Value"])
+
+        # Closed parts in the order they were appended, then the open periods.
+        files = sorted((f for f in os.listdir(section_dir) if f.endswith(".parquet")), key=lambda f: (f == "open.parquet", f))
+        if not files:
+            return pd.DataFrame(columns=["Company", period_col, "Metric", "Value"])
+
+        records = pd.concat([pd.read_parquet(os.path.join(section_dir, f)) for f in files], ignore_index=True)
+        if company is not None:
+            records["Company"] = company
+        return _latest_values(records, period_col)
+
+    def _append_section(self, section_dir, fresh, period_col):
+        os.makedirs(section_dir, exist_ok=True)
+        if fresh.empty:
+            return
+
+        is_open = fresh[period_col].isin(OPEN_PERIODS)
+        if period_col == "Year":
+            is_open |= fresh[period_col].isin(interim_periods(fresh[period_col].unique()))
+        fresh[~is_open].pipe(self._append_closed, section_dir, period_col)
+        _write_parquet(fresh[is_open], os.path.join(section_dir, "open.parquet"))
+
+    def _append_closed(self, closed, section_dir, period_col):
+        parts = sorted(f for f in os.listdir(section_dir) if f.startswith("part-"))
+
+        if parts:
+            # Only new periods and values that differ from the stored ones.
+            stored = pd.concat([pd.read_parquet(os.path.join(section_dir, f), columns=[period_col, "Metric", "Value"]) for f in parts])
+            stored = _latest_values(stored, period_col).set_index([period_col, "Metric"])["Value"]
+            keys = pd.MultiIndex.from_frame(closed[[period_col, "Metric"]])
+            previous = stored.reindex(keys).to_numpy()
+            value = closed["Value"].to_numpy(dtype=float)
+            changed = ~keys.isin(stored.index) | ~((previous == value) | (np.isnan(previous) & np.isnan(value)))
+            closed = closed[changed]
+
+        # Time-ordered, unique names: writers in other processes may append
+        # to the same section at once.
+        if not closed.empty:
+            _write_parquet(closed, os.path.join(section_dir, f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"))
+
+
+def _write_parquet(df, path):
+    # Written aside and swapped in, so readers never see a partial file.
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _latest_values(records, period_col):
+    # One row per (period, metric) in order of first appearance, holding
+    # the value appended last.
+    keys = pd.MultiIndex.from_frame(records[[period_col, "Metric"]])
+    latest = pd.Series(records["Value"].to_numpy()[~keys.duplicated(keep="last")], index=keys[~keys.duplicated(keep="last")])
+
+    first = ~keys.duplicated(keep="first")
+    records = records[first].reset_index(drop=True)
+    records["Value"] = latest.reindex(keys[first]).to_numpy()
+    return records
+
+
+financial_store = FinancialStore()
+
+
+def load_cached_company(url):
+    # A company's Year-indexed dataset (see scraper.index_years), shared by
+    # every session through the dataset cache and backed by the store.
+    return dataset_cache.get_or_load(url, lambda url: index_years(financial_store.load_company(url)))
@@ -0,0 +1,162 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = os.environ.get("METRICS_PORT")
+
+
+# -----------------------------
+# Stage Timings
+# -----------------------------
+class StageTimer:
+    # Wall time and payload size of every run of a hot-path stage (fetch,
+    # parse, pivot, clean, window, analytics, score, tab renders). Totals
+    # are kept for the whole process; the last max_records runs are kept
+    # for percentiles. Each run is also logged as one JSON line at DEBUG.
+    def __init__(self, max_records=2000):
+        self.records = deque(maxlen=max_records)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage, **fields):
+        # Fields set on the yielded dict (e.g. "bytes") go into the record.
+        record = {"stage": stage, **fields}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.add(record)
+
+    def add(self, record):
+        record.setdefault("at", time.time())
+        self.records.append(record)
+
+        with self._lock:
+            totals = self._totals.setdefault(record["stage"], {"count": 0, "seconds": 0.0, "bytes": 0})
+            totals["count"] += 1
+            totals["seconds"] += record["seconds"]
+            totals["bytes"] += record.get("bytes") or 0
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record, default=str))
+
+    def totals(self):
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._totals.items()}
+
+    def summary(self):
+        # One row per stage: process totals and percentiles of recent runs.
+        recent = pd.DataFrame(list(self.records), columns=["stage", "seconds"])
+        rows = []
+        for stage, totals in sorted(self.totals().items()):
+            seconds = recent.loc[recent["stage"] == stage, "seconds"].to_numpy()
+            p50, p95 = np.percentile(seconds, [50, 95]) if len(seconds) else (np.nan, np.nan)
+            rows.append({
+                "Stage": stage,
+                "Runs": totals["count"],
+                "Total ms": totals["seconds"] * 1000,
+                "Mean ms": totals["seconds"] * 1000 / totals["count"],
+                "p50 ms": p50 * 1000,
+                "p95 ms": p95 * 1000,
+                "KB": totals["bytes"] / 1024,
+            })
+        return pd.DataFrame(rows, columns=["Stage", "Runs", "Total ms", "Mean ms", "p50 ms", "p95 ms", "KB"])
+
+    def clear(self):
+        self.records.clear()
+        with self._lock:
+            self._totals.clear()
+
+
+stage_timer = StageTimer()
+
+
+def timed(stage):
+    # Decorator form of stage_timer.time for whole functions.
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer.time(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# -----------------------------
+# Prometheus Text
+# -----------------------------
+def prometheus_text(timer=stage_timer, caches=None):
+    # Prometheus text exposition of the stage totals and of the hit / miss
+    # counters of caches, a name -> object with a stats() method.
+    lines = [
+        "# HELP screener_stage_seconds Wall time spent in each pipeline stage.",
+        "# TYPE screener_stage_seconds summary",
+    ]
+    totals = timer.totals()
+    for stage, stage_totals in sorted(totals.items()):
+        lines.append(f'screener_stage_seconds_sum{{stage="{stage}"}} {stage_totals["seconds"]:.6f}')
+        lines.append(f'screener_stage_seconds_count{{stage="{stage}"}} {stage_totals["count"]}')
+
+    lines += [
+        "# HELP screener_stage_bytes_total Payload bytes handled by each pipeline stage.",
+        "# TYPE screener_stage_bytes_total counter",
+    ]
+    for stage, stage_totals in sorted(totals.items()):
+        if stage_totals["bytes"]:
+            lines.append(f'screener_stage_bytes_total{{stage="{stage}"}} {stage_totals["bytes"]}')
+
+    for name, cache in sorted((caches or {}).items()):
+        stats = cache.stats()
+        lines += [f"# TYPE screener_{name}_hits_total counter", f"screener_{name}_hits_total {stats['hits']}"]
+        lines += [f"# TYPE screener_{name}_misses_total counter", f"screener_{name}_misses_total {stats['misses']}"]
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    caches = {}
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = prometheus_text(caches=self.caches).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(caches=None, port=METRICS_PORT):
+    # One /metrics endpoint per process, for the App; a no-op without a port.
+    global _metrics_server
+
+    with _metrics_server_lock:
+        if _metrics_server is None and port:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"caches": caches or {}})
+            _metrics_server = ThreadingHTTPServer(("", int(port)), handler)
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _metrics_server